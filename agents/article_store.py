@@ -0,0 +1,225 @@
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+ARTICLE_STORE_FILE = os.getenv("ARTICLE_STORE_FILE", "articles.db")
+# Append-only history of every saved article, committed to git; articles.db (only in the
+# actions cache) is rebuilt from it when the cache is gone
+ARTICLE_LOG_FILE = os.getenv("ARTICLE_LOG_FILE", "articles.jsonl")
+LEGACY_ARTICLES_FILE = "translated_articles.json"
+FEED_DIR = os.getenv("FEED_DIR", "feed")
+FEED_PAGE_SIZE = int(os.getenv("FEED_PAGE_SIZE", "10"))
+
+# Only what index.html renders goes into the feed shards
+FEED_FIELDS = ("url", "title", "translated_title", "final_html", "saved_at")
+
+
+def load_saved_articles(target="article store", log_path=ARTICLE_LOG_FILE, legacy_path=LEGACY_ARTICLES_FILE):
+    """Every saved article, latest version per URL in first-saved order, for seeding ``target``.
+
+    Read from the article log; the legacy ``translated_articles.json`` is only
+    used before the log exists, when it was still rewritten on every run.
+    """
+    if log_path and os.path.exists(log_path):
+        articles = {}
+        bad_lines = 0
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    article = json.loads(line)
+                except ValueError:  # e.g. a line cut short by a crash mid-append
+                    bad_lines += 1
+                    continue
+                if article.get("url"):
+                    articles[article["url"]] = article
+        if bad_lines:
+            print(f"⚠️ Skipped {bad_lines} unreadable lines in {log_path} while seeding {target}")
+        return list(articles.values())
+
+    if not legacy_path or not os.path.exists(legacy_path):
+        return []
+    try:
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            articles = json.load(f).get("articles", [])
+    except Exception as e:
+        print(f"⚠️ Failed to seed {target} from {legacy_path}: {e}")
+        return []
+    return [article for article in articles if article.get("url")]
+
+
+def atomic_write(path, write):
+    """Call ``write(f)`` on a temp file next to ``path``, fsync it, then rename over ``path``."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ArticleStore:
+    """SQLite-backed article history, one row per source URL.
+
+    Saving is an upsert per article, so its cost doesn't grow with the
+    history. Rows keep their original insertion order across updates, which
+    is the order ``export_json`` writes them in and the order feed pages are
+    cut in.
+
+    Every upsert is also appended to ``log_path``, the durable copy of the
+    history that is committed to git. An empty store (say, after the actions
+    cache was evicted) is rebuilt from that log, or from the legacy
+    ``translated_articles.json`` before the log exists.
+    """
+
+    def __init__(self, path=ARTICLE_STORE_FILE, log_path=ARTICLE_LOG_FILE, seed=True):
+        self.path = path
+        self.log_path = log_path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS articles ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " url TEXT NOT NULL UNIQUE,"
+            " data TEXT NOT NULL,"
+            " saved_at TEXT NOT NULL,"
+            " dirty INTEGER NOT NULL DEFAULT 1)"
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(articles)")]
+        if "dirty" not in columns:
+            self._conn.execute("ALTER TABLE articles ADD COLUMN dirty INTEGER NOT NULL DEFAULT 1")
+        self._conn.commit()
+        if seed and self.is_empty():
+            self._seed()
+        if log_path and not os.path.exists(log_path):
+            self._start_log()
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def is_empty(self):
+        # Opened on every streamed save, so don't count the whole table
+        return self._conn.execute("SELECT 1 FROM articles LIMIT 1").fetchone() is None
+
+    def _seed(self):
+        articles = load_saved_articles("article store", self.log_path)
+        for article in articles:
+            self.upsert(article, commit=False, log=False)
+        self._conn.commit()
+        if articles:
+            print(f"🗄️ Seeded article store with {len(self)} saved articles")
+
+    def _start_log(self):
+        """Write what the store already holds as the first lines of a new article log."""
+        def write(f):
+            for article in self.iter_articles():
+                f.write(json.dumps(article, ensure_ascii=False) + "\n")
+        atomic_write(self.log_path, write)
+        print(f"🧾 Started article log {self.log_path} with {len(self)} articles")
+
+    def upsert(self, article, commit=True, log=True):
+        saved_at = article.get("saved_at") or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        data = json.dumps(article, ensure_ascii=False)
+        self._conn.execute(
+            "INSERT INTO articles (url, data, saved_at) VALUES (?, ?, ?)"
+            " ON CONFLICT(url) DO UPDATE SET data = excluded.data, saved_at = excluded.saved_at, dirty = 1",
+            (article["url"], data, saved_at),
+        )
+        if commit:
+            self._conn.commit()
+        if log and self.log_path:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(data + "\n")
+
+    def get(self, url):
+        row = self._conn.execute("SELECT data FROM articles WHERE url = ?", (url,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def iter_articles(self):
+        for (data,) in self._conn.execute("SELECT data FROM articles ORDER BY id"):
+            yield json.loads(data)
+
+    def export_json(self, filename=LEGACY_ARTICLES_FILE):
+        """Write every article to ``filename`` in the format index.html reads, atomically."""
+        def write(f):
+            f.write('{\n    "last_updated": %s,\n    "articles": [' % json.dumps(datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+            for i, article in enumerate(self.iter_articles()):
+                f.write("," if i else "")
+                f.write("\n        " + json.dumps(article, ensure_ascii=False, indent=4).replace("\n", "\n        "))
+            f.write("\n    ]\n}\n")
+
+        atomic_write(filename, write)
+
+    def export_feed(self, directory=FEED_DIR, page_size=FEED_PAGE_SIZE):
+        """Write the paginated feed index.html loads: a small manifest plus page shards.
+
+        Pages hold ``page_size`` articles each in insertion order, so only pages
+        with articles saved since the last export (and the last, growing page)
+        are rewritten. The manifest only lists the pages and counts, so its size
+        grows with the number of pages, not articles; per-article fields live
+        in the shards. If ``page_size`` differs from the one in the existing
+        manifest, every page is rewritten and leftover page files are removed.
+        """
+        os.makedirs(directory, exist_ok=True)
+        manifest_path = os.path.join(directory, "manifest.json")
+        previous_page_size = self._manifest_page_size(manifest_path)
+        repaginate = previous_page_size != page_size
+        rows = self._conn.execute("SELECT id, dirty FROM articles ORDER BY id").fetchall()
+
+        page_ids = {}
+        dirty_pages = set()
+        for ordinal, (row_id, dirty) in enumerate(rows):
+            page = ordinal // page_size + 1
+            page_ids.setdefault(page, []).append(row_id)
+            if dirty:
+                dirty_pages.add(page)
+
+        pages = []
+        rewritten = 0
+        for page, ids in sorted(page_ids.items()):
+            file_name = f"page-{page:05d}.json"
+            path = os.path.join(directory, file_name)
+            if repaginate or page in dirty_pages or not os.path.exists(path):
+                self._write_feed_page(path, ids)
+                rewritten += 1
+            pages.append({"file": file_name, "count": len(ids)})
+
+        if repaginate:
+            current = {page["file"] for page in pages}
+            for file_name in os.listdir(directory):
+                if file_name.startswith("page-") and file_name.endswith(".json") and file_name not in current:
+                    os.remove(os.path.join(directory, file_name))
+
+        manifest = {
+            "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "total": len(rows),
+            "page_size": page_size,
+            "pages": pages,
+        }
+        atomic_write(manifest_path, lambda f: json.dump(manifest, f, ensure_ascii=False, separators=(",", ":")))
+
+        self._conn.execute("UPDATE articles SET dirty = 0 WHERE dirty = 1")
+        self._conn.commit()
+        print(f"🗂️ Feed exported: {len(rows)} articles in {len(pages)} pages ({rewritten} rewritten)"
+              + (f", repaginated from {previous_page_size} to {page_size} per page"
+                 if repaginate and previous_page_size is not None else ""))
+
+    def _manifest_page_size(self, manifest_path):
+        """``page_size`` the existing feed was cut with, or None if there's no readable manifest."""
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("page_size")
+        except (OSError, ValueError):
+            return None
+
+    def _write_feed_page(self, path, ids):
+        placeholders = ",".join("?" * len(ids))
+        articles = []
+        for (data,) in self._conn.execute(f"SELECT data FROM articles WHERE id IN ({placeholders}) ORDER BY id", ids):
+            article = json.loads(data)
+            articles.append({field: article.get(field) for field in FEED_FIELDS})
+        atomic_write(path, lambda f: json.dump({"articles": articles}, f, ensure_ascii=False, separators=(",", ":")))
+
+    def close(self):
+        self._conn.close()
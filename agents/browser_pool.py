@@ -0,0 +1,123 @@
+import queue
+import threading
+from contextlib import contextmanager
+
+
+def new_headless_driver():
+    import undetected_chromedriver as uc
+
+    options = uc.ChromeOptions()
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    return uc.Chrome(options=options)
+
+
+class BrowserPool:
+    """A fixed set of long-lived headless drivers shared across page loads.
+
+    Drivers are started lazily, handed out one caller at a time and put back
+    after use. A driver is recycled after ``max_pages`` page loads, and thrown
+    away (and replaced on next demand) if a page load raises.
+    """
+
+    def __init__(self, size=1, max_pages=25, driver_factory=new_headless_driver):
+        self.size = max(1, size)
+        self.max_pages = max(1, max_pages)
+        self.driver_factory = driver_factory
+        self.stats = {"started": 0, "recycled": 0, "crashed": 0, "pages": 0}
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._live = 0
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _acquire(self):
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                can_start = self._live < self.size
+                if can_start:
+                    self._live += 1
+
+            if can_start:
+                break
+
+            # Every driver is busy; wait for one to come back, re-checking in
+            # case a crashed driver freed up a slot instead.
+            try:
+                return self._idle.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+        try:
+            driver = self.driver_factory()
+        except Exception:
+            with self._lock:
+                self._live -= 1
+            raise
+        self._count("started")
+        return {"driver": driver, "pages": 0}
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _discard(self, slot):
+        with self._lock:
+            self._live -= 1
+        try:
+            slot["driver"].quit()
+        except Exception as e:
+            print(f"⚠️ Failed to quit browser: {e}")
+
+    @contextmanager
+    def driver(self):
+        if self._closed:
+            raise RuntimeError("BrowserPool is closed.")
+
+        slot = self._acquire()
+        try:
+            yield slot["driver"]
+        except Exception:
+            self._count("crashed")
+            self._discard(slot)
+            raise
+
+        slot["pages"] += 1
+        self._count("pages")
+        if slot["pages"] >= self.max_pages or self._closed:
+            self._count("recycled")
+            self._discard(slot)
+        else:
+            self._idle.put(slot)
+
+    def fetch(self, url, retries=1):
+        """Load ``url`` in a pooled driver and return the rendered page source."""
+        for attempt in range(retries + 1):
+            try:
+                with self.driver() as driver:
+                    driver.get(url)
+                    return driver.page_source
+            except Exception as e:
+                print(f"⚠️ Browser crashed on {url} (attempt {attempt + 1}): {e}")
+                if attempt == retries:
+                    raise
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                slot = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(slot)
@@ -0,0 +1,84 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+CHECKPOINT_FILE = os.getenv("CHECKPOINT_FILE", "pipeline_state.db")
+
+# Pipeline stages in order; a checkpoint names the last one an article completed
+STAGES = ("scrape", "validate images", "dedupe", "translate", "rehost images", "render", "validate output", "publish", "save")
+# Stages whose dropped articles failed rather than were rejected; they stay checkpointed
+# at the stage before, so --resume (or the next run) retries them
+RETRY_STAGES = ("publish",)
+
+
+class CheckpointStore:
+    """SQLite state store holding each in-flight article as of its last completed stage.
+
+    Every stage records the articles it finished, so if a run dies the work
+    done so far (scraping, paid translation) survives on disk and
+    ``--resume`` can restart each article from the stage after its
+    checkpoint. Rows are dropped once the article is saved.
+    """
+
+    def __init__(self, path=CHECKPOINT_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " url TEXT NOT NULL UNIQUE,"
+            " stage TEXT NOT NULL,"
+            " data TEXT NOT NULL,"
+            " updated_at TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+
+    def record(self, stage, articles):
+        """Checkpoint ``articles`` as having completed ``stage`` (one transaction)."""
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage '{stage}'. Choose from: {', '.join(STAGES)}")
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = [
+            (article["url"], stage, json.dumps(article, ensure_ascii=False, default=str), now)
+            for article in articles if article.get("url")
+        ]
+        with self._lock:
+            # Upsert keeps the row id, so pending() returns articles in the order they were first scraped
+            self._conn.executemany(
+                "INSERT INTO checkpoints (url, stage, data, updated_at) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(url) DO UPDATE SET stage = excluded.stage, data = excluded.data,"
+                " updated_at = excluded.updated_at",
+                rows,
+            )
+            self._conn.commit()
+
+    def forget(self, articles):
+        """Drop the checkpoints of articles that were saved, or rejected by a stage."""
+        with self._lock:
+            self._conn.executemany("DELETE FROM checkpoints WHERE url = ?", [(a["url"],) for a in articles if a.get("url")])
+            self._conn.commit()
+
+    def pending(self):
+        """{stage: [articles whose last completed stage is stage]} in scrape order."""
+        with self._lock:
+            rows = self._conn.execute("SELECT stage, data FROM checkpoints ORDER BY id").fetchall()
+        pending = {}
+        for stage, data in rows:
+            pending.setdefault(stage, []).append(json.loads(data))
+        return pending
+
+    def summary(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT stage, COUNT(*) FROM checkpoints GROUP BY stage").fetchall()
+        return {stage: count for stage, count in sorted(rows, key=lambda row: STAGES.index(row[0]))}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
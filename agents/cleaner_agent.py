@@ -1,95 +1,71 @@
-import requests
-import os
-import time
 from agents.base_agent import BaseAgent
+from agents.content_score import clean_blocks, score_article
+from agents.gemini_client import GeminiClient
+from agents.metrics import metrics
+from agents.prompt_builder import PLACEHOLDER_RULE, compact_html, restore_html
 
-# Load Gemini API key
-GOOGLE_API_KEY = os.environ.get("GEMINI_API_KEY")
+CLEANER_MODEL = "gemini-1.5-flash"
+
+# One call both decides and cleans: the first line is the verdict, the rest the cleaned HTML
+REVIEW_PROMPT = (
+    "You are an expert tutorial content reviewer and cleaner. "
+    "Decide if the article the user sends is a structured tutorial containing clear steps, headings, explanations, and helpful images. "
+    "If it is promotional, too short, repetitive, or unstructured, reply with only the word SKIP.\n"
+    "Otherwise reply with the word KEEP on the first line, followed by the article HTML with any non-informative parts "
+    "like promotional text, footers, and irrelevant images removed. Keep important text, headings, and tutorial images.\n"
+    + PLACEHOLDER_RULE
+)
 
 class CleanerAgent(BaseAgent):
+    def __init__(self, role, goal, backstory, client=None):
+        super().__init__(role, goal, backstory)
+        # Rate limiting and retries live in the shared client, so articles can be cleaned concurrently
+        self.client = client or GeminiClient(model=CLEANER_MODEL)
+
     def run(self, articles):
         print("🧹 Cleaning articles with LLM assistance...")
-        cleaned_articles = []
 
-        for article in articles:
-            decision = self.llm_decide(article)
+        # Clear-cut articles are decided locally; only the ambiguous ones cost an API call
+        scores = [score_article(article) for article in articles]
+        ambiguous = [article for article, score in zip(articles, scores) if score.verdict == "ambiguous"]
+        print(f"📏 Heuristic pre-filter: {sum(s.verdict == 'keep' for s in scores)} keep, "
+              f"{sum(s.verdict == 'skip' for s in scores)} skip, {len(ambiguous)} sent to the LLM")
 
-            if decision.lower() == "keep":
-                cleaned_content = self.clean_content(article["content"])
-                article["content"] = cleaned_content
-                print(f"✅ Keeping: {article['title']}")
-                cleaned_articles.append(article)
-            else:
-                print(f"🚫 Skipping: {article['title']}")
+        reviewed = dict(zip(map(id, ambiguous), self.client.map(self.llm_review, ambiguous)))
 
-            time.sleep(1)  # Respect Gemini API rate limits
+        cleaned_articles = []
+        for article, score in zip(articles, scores):
+            if score.verdict == "ambiguous":
+                article = reviewed[id(article)]
+            elif score.verdict == "keep":
+                article["content"] = clean_blocks(article["content"])
+                print(f"✅ Keeping (score {score.score}): {article['title']}")
+            else:
+                print(f"🚫 Skipping (score {score.score}): {article['title']}")
+                article = None
+            metrics.inc("cleaner_decisions_total", verdict="keep" if article else "skip",
+                        source="llm" if score.verdict == "ambiguous" else "heuristic")
+            if article is not None:
+                cleaned_articles.append(article)
 
         print(f"✅ Cleaning complete. Articles kept: {len(cleaned_articles)}")
         return cleaned_articles
 
-    def llm_decide(self, article):
-        prompt = (
-            "You are an expert tutorial content reviewer. "
-            "Analyze the following article and decide if it is a structured tutorial containing clear steps, headings, explanations, and helpful images. "
-            "If yes, reply with 'Keep'. If it is promotional, too short, repetitive, or unstructured, reply with 'Skip'. "
-            "Only reply with either 'Keep' or 'Skip' without additional sentences.\n\n"
-            f"Title: {article.get('title', '')}\n"
-            f"Content:\n{article.get('content', '')}\n\n"
-            "Your decision:"
+    def llm_review(self, article):
+        """Decide and clean in one Gemini call; returns the cleaned article, or None to skip it."""
+        content, placeholders = compact_html(article.get("content", ""))
+        reply = self.client.generate(
+            f"Title: {article.get('title', '')}\n\n{content}", label="LLM review", system=REVIEW_PROMPT
         )
+        decision, _, cleaned_html = reply.strip().partition("\n")
+        print(f"🤖 LLM Decision: {decision.strip() or '(no reply)'}")
 
-        try:
-            response = requests.post(
-                f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={GOOGLE_API_KEY}",
-                headers={"Content-Type": "application/json"},
-                json={"contents": [{"parts": [{"text": prompt}]}]}
-            )
-
-            if response.status_code == 200:
-                decision_text = (
-                    response.json()
-                    .get("candidates", [{}])[0]
-                    .get("content", {})
-                    .get("parts", [{}])[0]
-                    .get("text", "")
-                )
-                print(f"🤖 LLM Decision: {decision_text.strip()}")
-                return decision_text.strip()
-            else:
-                print(f"⚠️ LLM API error {response.status_code}: {response.text}")
-                return "Skip"
-
-        except Exception as e:
-            print(f"❌ Exception during LLM call: {e}")
-            return "Skip"
-
-    def clean_content(self, html_content):
-        prompt = (
-            "You are a content cleaner. Remove any non-informative parts like promotional text, footers, and irrelevant images from this HTML content. "
-            "Keep important text, headings, and tutorial images. Only return clean HTML:\n\n"
-            f"{html_content}"
-        )
-
-        try:
-            response = requests.post(
-                f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={GOOGLE_API_KEY}",
-                headers={"Content-Type": "application/json"},
-                json={"contents": [{"parts": [{"text": prompt}]}]}
-            )
-
-            if response.status_code == 200:
-                cleaned_html = (
-                    response.json()
-                    .get("candidates", [{}])[0]
-                    .get("content", {})
-                    .get("parts", [{}])[0]
-                    .get("text", "")
-                )
-                return cleaned_html
-            else:
-                print(f"⚠️ Gemini API content clean error {response.status_code}: {response.text}")
-                return html_content
+        if decision.strip().strip("*").upper() != "KEEP":
+            print(f"🚫 Skipping: {article['title']}")
+            return None
 
-        except Exception as e:
-            print(f"❌ Error cleaning content: {e}")
-            return html_content
+        cleaned_html = cleaned_html.strip().removeprefix("```html").removeprefix("```").removesuffix("```").strip()
+        if cleaned_html:
+            article["content"], _ = restore_html(cleaned_html, placeholders)
+        print(f"✅ Keeping: {article['title']}")
+        return article
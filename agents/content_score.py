@@ -0,0 +1,77 @@
+import os
+import re
+from collections import namedtuple
+
+from .html_chunker import is_image_block, split_blocks, strip_tags
+
+# Scores at or above KEEP are kept and at or below SKIP are dropped without an LLM call;
+# only articles in between are sent to Gemini
+CLEANER_KEEP_SCORE = float(os.getenv("CLEANER_KEEP_SCORE", "0.75"))
+CLEANER_SKIP_SCORE = float(os.getenv("CLEANER_SKIP_SCORE", "0.35"))
+CLEANER_MIN_WORDS = int(os.getenv("CLEANER_MIN_WORDS", "120"))  # Shorter than this is never a tutorial
+
+PROMO_PHRASES = (
+    "sign up", "register now", "register today", "join now", "download the app", "limited time",
+    "exclusive offer", "bonus", "airdrop", "giveaway", "claim your", "promo code", "invite code",
+    "referral", "don't miss", "trade now", "start trading now", "click here", "follow us",
+)
+
+_HEADING_RE = re.compile(r"<h[2-4]\b", re.I)
+_PROMO_RE = re.compile("|".join(re.escape(phrase) for phrase in PROMO_PHRASES), re.I)
+
+ContentScore = namedtuple("ContentScore", [
+    "words", "headings", "images", "promo_per_100_words", "duplicate_ratio", "score", "verdict",
+])
+
+
+def _words(html):
+    return strip_tags(html).split()
+
+
+def score_article(article, keep=CLEANER_KEEP_SCORE, skip=CLEANER_SKIP_SCORE, min_words=CLEANER_MIN_WORDS):
+    """Rate how much an article looks like a real tutorial, without calling any API.
+
+    The score (0-1) rewards length, headings and images and penalises
+    promotional phrases and repeated blocks. ``verdict`` is "keep", "skip" or
+    "ambiguous" (ask the LLM).
+    """
+    content = article.get("content") or ""
+    blocks = split_blocks(content)
+    text_blocks = [b for b in blocks if not is_image_block(b)]
+    words = len(_words(content))
+    headings = len(_HEADING_RE.findall(content))
+    images = len(blocks) - len(text_blocks)
+    promo = len(_PROMO_RE.findall(strip_tags(content))) * 100 / words if words else 0.0
+    duplicates = (len(text_blocks) - len(set(text_blocks))) / len(text_blocks) if text_blocks else 0.0
+
+    score = (
+        0.35 * min(words / 600, 1.0)
+        + 0.25 * min(headings / 3, 1.0)
+        + 0.15 * min(images / 2, 1.0)
+        + 0.15 * max(0.0, 1 - promo / 2)
+        + 0.10 * max(0.0, 1 - duplicates * 4)
+    )
+    if words < min_words or duplicates > 0.5:
+        score = 0.0
+
+    if score >= keep:
+        verdict = "keep"
+    elif score <= skip:
+        verdict = "skip"
+    else:
+        verdict = "ambiguous"
+    return ContentScore(words, headings, images, round(promo, 2), round(duplicates, 2), round(score, 3), verdict)
+
+
+def clean_blocks(html):
+    """Local cleanup for clear keeps: drop repeated blocks and short promotional ones."""
+    kept = []
+    seen = set()
+    for block in split_blocks(html):
+        if block in seen:
+            continue
+        seen.add(block)
+        if not is_image_block(block) and _PROMO_RE.search(block) and len(_words(block)) < 40:
+            continue
+        kept.append(block)
+    return "".join(kept)
@@ -0,0 +1,74 @@
+import os
+import threading
+
+from .base_agent import BaseAgent
+from .dedup_index import NearDuplicateIndex, index_lock, simhash
+from .metrics import metrics
+from .seen_index import SeenIndex
+
+# "skip" drops near-duplicates for this run, "merge" also folds them into the original so
+# later runs don't even scrape them again, "off" lets everything through
+DEDUP_ACTION = os.getenv("DEDUP_ACTION", "skip")
+
+
+class DedupAgent(BaseAgent):
+    """Drops articles whose text is nearly identical to one already saved, or to an earlier one in this run."""
+
+    def __init__(self, role, goal, backstory, index=None):
+        super().__init__(role, goal, backstory)
+        self._index = index
+        # Articles kept earlier in this run; they only reach the saved index once SaverAgent saves them
+        self._pending = NearDuplicateIndex(path=None, seed=False)
+        self._kept = {}
+        self._lock = threading.Lock()
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = NearDuplicateIndex()
+        return self._index
+
+    def run(self, articles):
+        if DEDUP_ACTION == "off":
+            return articles
+
+        unique = []
+        with self._lock:
+            for article in articles:
+                fingerprint = simhash(article.get("content"))
+                article["simhash"] = f"{fingerprint:016x}"
+
+                match = (self.index.find(fingerprint, exclude=article["url"])
+                         or self._pending.find(fingerprint, exclude=article["url"]))
+                if match is None:
+                    self._pending.add(article, fingerprint)
+                    self._kept[article["url"]] = article
+                    unique.append(article)
+                    metrics.inc("articles_total", stage="dedupe", outcome="unique")
+                    continue
+
+                original, distance = match
+                print(f"♊ Near-duplicate of {original} ({distance} bits apart), "
+                      f"{'merged' if DEDUP_ACTION == 'merge' else 'skipped'}: {article['title']}")
+                metrics.inc("articles_total", stage="dedupe", outcome=DEDUP_ACTION)
+                if DEDUP_ACTION == "merge":
+                    self._merge(article, original)
+
+        print(f"✅ Near-duplicate check: {len(unique)} of {len(articles)} articles are new")
+        return unique
+
+    def _merge(self, article, original):
+        """Record ``article`` as an alias of ``original`` and mark it seen, so the scraper skips it next time."""
+        duplicate = {key: article.get(key) for key in ("url", "title", "content_hash", "etag", "last_modified")}
+        with index_lock:
+            index = NearDuplicateIndex()
+            if original in self._kept and original not in index.entries:
+                # Not saved yet: SaverAgent records the alias if and when it saves the original
+                self._kept[original].setdefault("duplicates", []).append(duplicate)
+                return
+
+            index.add_alias(article["url"], original)
+            index.save()
+            seen = SeenIndex()
+            seen.mark(duplicate)
+            seen.save()
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime
+
+from .article_store import atomic_write, load_saved_articles
+from .html_chunker import is_image_block, split_blocks, strip_tags
+
+DEDUP_INDEX_FILE = os.getenv("DEDUP_INDEX_FILE", "near_duplicates.json")
+DEDUP_MAX_DISTANCE = int(os.getenv("DEDUP_MAX_DISTANCE", "3"))  # Max differing SimHash bits to count as a duplicate
+
+SIMHASH_BITS = 64
+SHINGLE_WORDS = 3
+
+# Held around every load-modify-save of the saved index (and the seen index alongside it),
+# since the dedupe and save stages both update them while streaming
+index_lock = threading.RLock()
+
+_WORD_RE = re.compile(r"\w+", re.U)
+
+
+def _shingles(content):
+    # Text blocks only: copies of a guide usually differ in their image URLs, not their words
+    for block in split_blocks(content or ""):
+        if is_image_block(block):
+            continue
+        words = _WORD_RE.findall(strip_tags(block).lower())
+        if len(words) < SHINGLE_WORDS:
+            if words:
+                yield " ".join(words)
+            continue
+        for i in range(len(words) - SHINGLE_WORDS + 1):
+            yield " ".join(words[i:i + SHINGLE_WORDS])
+
+
+def simhash(content):
+    """64-bit SimHash of the article's text blocks; near-identical texts differ in few bits."""
+    weights = [0] * SIMHASH_BITS
+    for shingle in _shingles(content):
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class NearDuplicateIndex:
+    """Persistent SimHash fingerprints of every saved article, for near-duplicate lookups.
+
+    Fingerprints are split into ``max_distance + 1`` bands; two fingerprints
+    within ``max_distance`` bits must agree on at least one whole band, so a
+    lookup only compares against articles sharing a band. Merged duplicates
+    are kept as aliases of the article they were folded into. If the index
+    file doesn't exist yet it is seeded from the saved article history.
+    """
+
+    def __init__(self, path=DEDUP_INDEX_FILE, max_distance=DEDUP_MAX_DISTANCE, seed=True):
+        self.path = path
+        self.max_distance = max_distance
+        self.entries = {}
+        self.aliases = {}
+        self._bands = []
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.entries = data.get("urls", {})
+                self.aliases = data.get("aliases", {})
+            except Exception as e:
+                print(f"⚠️ Failed to load near-duplicate index {path}: {e}")
+        elif seed:
+            self._seed()
+        self._rebuild_bands()
+
+    def _seed(self):
+        for article in load_saved_articles("near-duplicate index"):
+            if article.get("content"):
+                self.entries[article["url"]] = self._entry(article, simhash(article["content"]))
+        if self.entries:
+            print(f"🗂️ Seeded near-duplicate index with {len(self.entries)} saved articles")
+
+    def _entry(self, article, fingerprint):
+        return {
+            "simhash": f"{fingerprint:016x}",
+            "title": article.get("title", ""),
+            "seen_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    def _band_keys(self, fingerprint):
+        bands = self.max_distance + 1
+        width = SIMHASH_BITS // bands
+        for band in range(bands):
+            bits = width if band < bands - 1 else SIMHASH_BITS - width * band
+            yield band, fingerprint >> (band * width) & ((1 << bits) - 1)
+
+    def _rebuild_bands(self):
+        self._bands = [{} for _ in range(self.max_distance + 1)]
+        for url, entry in self.entries.items():
+            self._index(url, int(entry["simhash"], 16))
+
+    def _index(self, url, fingerprint):
+        for band, key in self._band_keys(fingerprint):
+            self._bands[band].setdefault(key, set()).add(url)
+
+    def __contains__(self, url):
+        return url in self.entries or url in self.aliases
+
+    def __len__(self):
+        return len(self.entries)
+
+    def find(self, fingerprint, exclude=None):
+        """(url, distance) of the closest indexed article within ``max_distance``, or None."""
+        with self._lock:
+            candidates = set()
+            for band, key in self._band_keys(fingerprint):
+                candidates |= self._bands[band].get(key, set())
+            best = None
+            for url in candidates - {exclude}:
+                distance = hamming(fingerprint, int(self.entries[url]["simhash"], 16))
+                if distance <= self.max_distance and (best is None or distance < best[1]):
+                    best = (url, distance)
+            return best
+
+    def add(self, article, fingerprint=None):
+        """Index a saved article, plus any duplicates merged into it."""
+        if fingerprint is None:
+            fingerprint = int(article["simhash"], 16) if article.get("simhash") else simhash(article.get("content"))
+        with self._lock:
+            old = self.entries.get(article["url"])
+            if old is not None:
+                # Content changed since it was indexed: drop the stale band entries first
+                for band, key in self._band_keys(int(old["simhash"], 16)):
+                    self._bands[band].get(key, set()).discard(article["url"])
+            self.entries[article["url"]] = self._entry(article, fingerprint)
+            self._index(article["url"], fingerprint)
+            for duplicate in article.get("duplicates", []):
+                self.aliases[duplicate["url"]] = article["url"]
+
+    def add_alias(self, duplicate_url, canonical_url):
+        with self._lock:
+            self.aliases[duplicate_url] = canonical_url
+
+    def save(self):
+        with self._lock:
+            data = {"urls": self.entries, "aliases": self.aliases}
+            atomic_write(self.path, lambda f: json.dump(data, f, ensure_ascii=False, indent=1))
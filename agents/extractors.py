@@ -0,0 +1,201 @@
+from html import escape
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from .html_chunker import strip_tags
+
+try:
+    from lxml import html as lxml_html
+except ImportError:  # lxml is optional; get_extractor falls back to BeautifulSoup
+    lxml_html = None
+
+
+def text_length(content):
+    """Visible text characters in extracted content HTML."""
+    return len(strip_tags(content or "", "").strip())
+
+
+def is_complete(article, min_text_chars=200):
+    """True when an extracted article has a title and enough body text to be worth translating."""
+    return bool(article and article.get("title")) and text_length(article.get("content")) >= min_text_chars
+
+
+class BeautifulSoupExtractor:
+    """The original extractor: ``find_all`` over the whole page with html.parser.
+
+    Nested spans and paragraphs are matched separately, so their text can be
+    emitted more than once. Kept for comparison and as the no-lxml fallback.
+    """
+
+    name = "bs4"
+
+    def extract(self, html, url):
+        page_soup = BeautifulSoup(html, "html.parser")
+        h1 = page_soup.find("h1")
+        if h1 is None:
+            return None
+
+        title = h1.text.strip()
+        content_blocks = []
+
+        # Extract structured content in order (including <span> and <img>)
+        for elem in page_soup.find_all(['h2', 'h3', 'p', 'ul', 'blockquote', 'pre', 'span', 'img']):
+            if elem.name in ['h2', 'h3']:
+                content_blocks.append(f"<h2>{elem.get_text(strip=True)}</h2>")
+            elif elem.name == 'p':
+                content_blocks.append(f"<p>{elem.get_text(strip=True)}</p>")
+            elif elem.name == 'ul':
+                ul_content = "<ul>" + "".join(f"<li>{li.get_text(strip=True)}</li>" for li in elem.find_all('li')) + "</ul>"
+                content_blocks.append(ul_content)
+            elif elem.name == 'blockquote':
+                content_blocks.append(f"<blockquote>{elem.get_text(strip=True)}</blockquote>")
+            elif elem.name == 'pre':
+                content_blocks.append(f"<pre>{elem.get_text(strip=True)}</pre>")
+            elif elem.name == 'span':
+                # Add span text if meaningful
+                text = elem.get_text(strip=True)
+                if text:
+                    content_blocks.append(f"<p>{text}</p>")
+            elif elem.name == 'img':
+                src = elem.get('src')
+                if src:
+                    content_blocks.append(f'<img src="{urljoin(url, src)}" alt="tutorial image" />')
+
+        return {
+            "url": url,
+            "title": title,
+            "content": "".join(content_blocks)
+        }
+
+
+class LxmlExtractor:
+    """Single pass over the main article container with lxml.
+
+    Elements are visited once in document order. A block (heading, paragraph,
+    list, quote, code, image or loose span) is emitted whole and its children
+    are not visited again, so nested text can't be duplicated. Identical
+    blocks that repeat later in the page are dropped too.
+    """
+
+    name = "lxml"
+
+    SKIP_TAGS = {"script", "style", "noscript", "template", "nav", "header", "footer", "aside",
+                 "form", "button", "svg", "iframe", "h1"}
+    HEADING_TAGS = {"h2", "h3", "h4"}
+    TEXT_TAGS = {"p", "blockquote", "pre"}
+    LIST_TAGS = {"ul", "ol"}
+
+    def extract(self, html, url):
+        root = lxml_html.fromstring(html)
+        h1 = next(root.iter("h1"), None)
+        if h1 is None:
+            return None
+
+        blocks = []
+        seen = set()
+        self._walk(self._main_container(root, h1), url, blocks, seen)
+        return {
+            "url": url,
+            "title": self._text(h1),
+            "content": "".join(blocks)
+        }
+
+    def _main_container(self, root, h1):
+        # Prefer an explicit article/main element; otherwise climb from the <h1>
+        # until the ancestor holds most of the page's paragraphs.
+        candidates = root.xpath("//article | //main | //*[@role='main']")
+        if candidates:
+            return max(candidates, key=lambda el: len(el.xpath(".//p")))
+
+        total = len(root.xpath("//p"))
+        node = h1.getparent()
+        while node is not None and node.getparent() is not None:
+            if total and len(node.xpath(".//p")) * 2 >= total:
+                return node
+            node = node.getparent()
+        return root
+
+    def _text(self, el):
+        return " ".join(el.text_content().split())
+
+    def _list_items(self, list_el):
+        """Text of the list's own ``<li>`` items, each once; nested items follow their parent.
+
+        Nested lists are flattened because the rest of the pipeline splits
+        content into flat top-level blocks.
+        """
+        items = []
+        for li in list_el:
+            if not isinstance(li.tag, str) or li.tag.lower() != "li":
+                continue
+            pieces = [li.text or ""]
+            nested = []
+            for child in li:
+                if isinstance(child.tag, str) and child.tag.lower() in self.LIST_TAGS:
+                    nested.extend(self._list_items(child))
+                elif isinstance(child.tag, str):
+                    pieces.extend(child.itertext())
+                pieces.append(child.tail or "")
+            # Joined with a space so "<li>A<br>B</li>" doesn't read "AB"
+            text = " ".join(" ".join(pieces).split())
+            if text:
+                items.append(text)
+            items.extend(nested)
+        return items
+
+    def _emit(self, block, blocks, seen):
+        if block not in seen:
+            seen.add(block)
+            blocks.append(block)
+
+    def _walk(self, parent, url, blocks, seen):
+        for el in parent:
+            if not isinstance(el.tag, str):  # Comments and processing instructions
+                continue
+            tag = el.tag.lower()
+            if tag in self.SKIP_TAGS:
+                continue
+
+            if tag in self.HEADING_TAGS:
+                text = self._text(el)
+                if text:
+                    self._emit(f"<h2>{escape(text, quote=False)}</h2>", blocks, seen)
+            elif tag in self.TEXT_TAGS:
+                text = self._text(el)
+                if text:
+                    self._emit(f"<{tag}>{escape(text, quote=False)}</{tag}>", blocks, seen)
+                for img in el.iter("img"):  # Images inside a paragraph still count
+                    self._emit_image(img, url, blocks, seen)
+            elif tag in self.LIST_TAGS:
+                items = "".join(f"<li>{escape(item, quote=False)}</li>" for item in self._list_items(el))
+                if items:
+                    self._emit(f"<{tag}>{items}</{tag}>", blocks, seen)
+            elif tag == "img":
+                self._emit_image(el, url, blocks, seen)
+            elif tag == "span":
+                text = self._text(el)
+                if text:
+                    self._emit(f"<p>{escape(text, quote=False)}</p>", blocks, seen)
+            else:
+                self._walk(el, url, blocks, seen)
+
+    def _emit_image(self, img, url, blocks, seen):
+        src = img.get("src") or img.get("data-src")
+        if src and not src.startswith("data:"):
+            self._emit(f'<img src="{escape(urljoin(url, src))}" alt="tutorial image" />', blocks, seen)
+
+
+EXTRACTORS = {
+    BeautifulSoupExtractor.name: BeautifulSoupExtractor,
+    LxmlExtractor.name: LxmlExtractor,
+}
+
+
+def get_extractor(name="lxml"):
+    if name == LxmlExtractor.name and lxml_html is None:
+        print("⚠️ lxml isn't installed; falling back to the BeautifulSoup extractor.")
+        name = BeautifulSoupExtractor.name
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown extractor '{name}'. Choose from: {', '.join(EXTRACTORS)}")
+    return EXTRACTORS[name]()
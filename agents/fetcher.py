@@ -0,0 +1,82 @@
+import threading
+from collections import namedtuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .metrics import metrics
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+
+# tier is "http" or "browser"; doc is whatever the caller's parse() made of the page.
+# A 304 result means the page is unchanged since the given validators and has no doc.
+FetchResult = namedtuple("FetchResult", ["url", "tier", "status", "doc", "etag", "last_modified"])
+
+
+class TieredFetcher:
+    """Fetches pages with a plain pooled HTTP GET, falling back to the browser.
+
+    Each page is parsed once with the caller's ``parse(html)``. The HTTP
+    response is accepted only when ``complete(doc)`` passes, so pages that need
+    JavaScript to render still go through the browser pool.
+    """
+
+    def __init__(self, browser_pool, http_first=True, timeout=15, pool_size=10):
+        self.browser_pool = browser_pool
+        self.http_first = http_first
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": USER_AGENT})
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.stats = {"http": 0, "browser": 0}
+        self.tiers = {}
+        self._lock = threading.Lock()
+
+    def _record(self, url, tier):
+        with self._lock:
+            self.stats[tier] += 1
+            self.tiers[url] = tier
+        metrics.inc("fetch_total", tier=tier)
+
+    def _fetch_http(self, url, etag=None, last_modified=None):
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            print(f"⚠️ HTTP fetch failed for {url}: {e}")
+            return None
+        if response.status_code not in (200, 304):
+            return None
+        return response
+
+    def fetch(self, url, parse, complete=bool, etag=None, last_modified=None):
+        """Fetch ``url``; pass the validators from a previous fetch to allow a 304."""
+        new_etag, new_last_modified = None, None
+        if self.http_first:
+            response = self._fetch_http(url, etag, last_modified)
+            if response is not None:
+                new_etag = response.headers.get("ETag")
+                new_last_modified = response.headers.get("Last-Modified")
+                if response.status_code == 304:
+                    self._record(url, "http")
+                    return FetchResult(url, "http", 304, None, etag, last_modified)
+                doc = parse(response.text)
+                if complete(doc):
+                    self._record(url, "http")
+                    return FetchResult(url, "http", response.status_code, doc, new_etag, new_last_modified)
+
+        doc = parse(self.browser_pool.fetch(url))
+        self._record(url, "browser")
+        return FetchResult(url, "browser", 200, doc, new_etag, new_last_modified)
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,155 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .log import get_logger
+from .metrics import metrics
+from .rate_limit import TokenBucket, retry_delay
+
+GEMINI_API_BASE = os.getenv("GEMINI_API_BASE", "https://generativelanguage.googleapis.com/v1beta")
+GEMINI_RPM = int(os.getenv("GEMINI_RPM", "15"))  # Requests per minute allowed by the quota
+GEMINI_TPM = int(os.getenv("GEMINI_TPM", "1000000"))  # Input tokens per minute allowed by the quota
+GEMINI_MAX_WORKERS = int(os.getenv("GEMINI_MAX_WORKERS", "4"))  # Requests in flight at once
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "5"))
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# usageMetadata field -> stats / metrics name
+USAGE_FIELDS = {
+    "promptTokenCount": "prompt_tokens",
+    "cachedContentTokenCount": "cached_tokens",
+    "candidatesTokenCount": "output_tokens",
+    "totalTokenCount": "total_tokens",
+}
+
+log = get_logger(__name__)
+
+
+def estimate_tokens(text):
+    # Rough rule of thumb for English/Malay prose: ~4 characters per token
+    return len(text) // 4 + 1
+
+
+def extract_text(data):
+    return (
+        data.get("candidates", [{}])[0]
+        .get("content", {})
+        .get("parts", [{}])[0]
+        .get("text", "")
+        .strip()
+    )
+
+
+class GeminiClient:
+    """Shared, thread-safe client for the Gemini ``generateContent`` endpoint.
+
+    All calls go through one pooled ``requests.Session`` and two token buckets
+    (requests/minute and tokens/minute). Failed calls are retried with
+    exponential backoff plus jitter, honouring ``Retry-After`` on 429s.
+    ``map`` runs many calls concurrently, bounded by ``max_workers``.
+    The ``usageMetadata`` of every response is added to ``stats`` and the
+    run metrics, so the real token spend is visible per purpose.
+    """
+
+    def __init__(self, model="gemini-2.0-flash", api_key=None, rpm=GEMINI_RPM, tpm=GEMINI_TPM,
+                 max_workers=GEMINI_MAX_WORKERS, max_retries=GEMINI_MAX_RETRIES, timeout=120):
+        self.model = model
+        self._api_key = api_key
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.request_bucket = TokenBucket.per_minute(rpm)
+        self.token_bucket = TokenBucket.per_minute(tpm)
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "throttled_seconds": 0.0}
+        self.stats.update({name: 0 for name in USAGE_FIELDS.values()})
+        self._lock = threading.Lock()
+
+    @property
+    def api_key(self):
+        return self._api_key or os.getenv("GEMINI_API_KEY")
+
+    @property
+    def url(self):
+        return f"{GEMINI_API_BASE}/models/{self.model}:generateContent"
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def generate(self, prompt, label="Gemini", system=None):
+        """Send ``prompt`` and return the response text, or "" once retries are exhausted.
+
+        Static instructions go in ``system`` (sent as ``systemInstruction``) so
+        the user turn carries only the text to work on.
+        """
+        payload = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+        if system:
+            payload["systemInstruction"] = {"parts": [{"text": system}]}
+        return self.generate_payload(payload, estimate_tokens((system or "") + prompt), label)
+
+    def _record_usage(self, usage, label):
+        counts = {name: int(usage.get(field) or 0) for field, name in USAGE_FIELDS.items()}
+        with self._lock:
+            for name, count in counts.items():
+                self.stats[name] += count
+        for name, count in counts.items():
+            if count:
+                metrics.inc("gemini_usage_tokens_total", count, model=self.model, purpose=label, type=name)
+        log.debug("gemini.usage", model=self.model, purpose=label, **counts)
+
+    def generate_payload(self, payload, tokens=1, label="Gemini"):
+        for attempt in range(self.max_retries + 1):
+            waited = self.request_bucket.acquire()
+            waited += self.token_bucket.acquire(tokens)
+            if waited:
+                self._count("throttled_seconds", waited)
+                metrics.inc("gemini_throttled_seconds_total", waited, model=self.model)
+
+            response = None
+            start = time.perf_counter()
+            try:
+                self._count("requests")
+                metrics.inc("gemini_tokens_estimated_total", tokens, model=self.model)
+                response = self.session.post(self.url, params={"key": self.api_key}, json=payload, timeout=self.timeout)
+                metrics.inc("api_requests_total", api="gemini", endpoint=self.model, status=response.status_code)
+                if response.status_code == 200:
+                    data = response.json()
+                    self._record_usage(data.get("usageMetadata") or {}, label)
+                    return extract_text(data)
+                print(f"⚠️ {label} API error {response.status_code}: {response.text[:300]}")
+                if response.status_code not in RETRYABLE_STATUSES:
+                    break
+            except requests.RequestException as e:
+                metrics.inc("api_requests_total", api="gemini", endpoint=self.model, status="error")
+                print(f"❌ {label} request exception: {e}")
+            finally:
+                metrics.observe("api_request_seconds", time.perf_counter() - start, api="gemini", endpoint=self.model)
+
+            if attempt < self.max_retries:
+                self._count("retries")
+                metrics.inc("api_retries_total", api="gemini")
+                time.sleep(retry_delay(attempt, response))
+
+        self._count("failures")
+        metrics.inc("api_failures_total", api="gemini")
+        return ""
+
+    def map(self, fn, items):
+        """Apply ``fn`` to every item concurrently and return the results in input order."""
+        items = list(items)
+        if len(items) <= 1 or self.max_workers == 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as pool:
+            return list(pool.map(fn, items))
+
+    def close(self):
+        self.session.close()
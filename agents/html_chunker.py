@@ -0,0 +1,65 @@
+import re
+
+# Top-level blocks as emitted by ScraperAgent: headings, paragraphs, lists, quotes,
+# code and standalone <img /> tags. Anything in between is kept as a raw block.
+BLOCK_RE = re.compile(
+    r"<(h[1-6]|p|ul|ol|blockquote|pre|table)\b[^>]*>.*?</\1\s*>|<img\b[^>]*>",
+    re.S | re.I,
+)
+
+TAGS_RE = re.compile(r"<[^>]+>")
+
+
+def strip_tags(html, replacement=" "):
+    """``html`` with every tag replaced by ``replacement``."""
+    return TAGS_RE.sub(replacement, html)
+
+
+def split_blocks(html):
+    """Split flat article HTML into its top-level blocks, in document order."""
+    blocks = []
+    pos = 0
+    for match in BLOCK_RE.finditer(html):
+        gap = html[pos:match.start()]
+        if gap.strip():
+            blocks.append(gap.strip())
+        blocks.append(match.group(0))
+        pos = match.end()
+    tail = html[pos:]
+    if tail.strip():
+        blocks.append(tail.strip())
+    return blocks
+
+
+def is_image_block(block):
+    return block[:4].lower() == "<img"
+
+
+def chunk_html(html, max_chars=4000):
+    """Group blocks into size-bounded segments for translation.
+
+    Returns a list of ``(kind, html)`` pairs where kind is ``"image"`` (pass
+    through untouched) or ``"text"`` (needs translating). Text segments never
+    cross an image and stay under ``max_chars`` unless a single block is bigger.
+    """
+    segments = []
+    current = []
+    size = 0
+
+    def flush():
+        nonlocal current, size
+        if current:
+            segments.append(("text", "".join(current)))
+        current, size = [], 0
+
+    for block in split_blocks(html):
+        if is_image_block(block):
+            flush()
+            segments.append(("image", block))
+            continue
+        if current and size + len(block) > max_chars:
+            flush()
+        current.append(block)
+        size += len(block)
+    flush()
+    return segments
@@ -0,0 +1,97 @@
+from collections import namedtuple
+from html.parser import HTMLParser
+
+# Text that means a stage gave up on this piece of the article
+FAILURE_MARKERS = ("[Translation failed]", "[[IMG_", "[[URL_")
+
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+# End tags HTML lets you leave out; not reported as unclosed
+OPTIONAL_END_TAGS = {"p", "li", "dt", "dd", "tr", "td", "th", "thead", "tbody", "tfoot", "option"}
+
+HtmlFacts = namedtuple("HtmlFacts", [
+    "images", "headings", "heading_issues", "broken_tags", "failure_markers", "text_chars",
+])
+
+
+class _FactsParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.images = 0
+        self.headings = []
+        self.broken = []
+        self.markers = set()
+        self.text_chars = 0
+        self.stack = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "img":
+            if dict(attrs).get("src"):
+                self.images += 1
+        elif len(tag) == 2 and tag[0] == "h" and tag[1] in "123456":
+            self.headings.append(int(tag[1]))
+        if tag not in VOID_TAGS:
+            self.stack.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.stack.pop()
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS:
+            return
+        if tag not in self.stack:
+            self.broken.append(f"stray </{tag}>")
+            return
+        while self.stack:
+            open_tag = self.stack.pop()
+            if open_tag == tag:
+                break
+            if open_tag not in OPTIONAL_END_TAGS:
+                self.broken.append(f"<{open_tag}> not closed")
+
+    def handle_data(self, data):
+        self.text_chars += len(data.strip())
+        for marker in FAILURE_MARKERS:
+            if marker in data:
+                self.markers.add(marker)
+
+    def close(self):
+        super().close()
+        self.broken.extend(f"<{tag}> not closed" for tag in self.stack if tag not in OPTIONAL_END_TAGS)
+        self.stack = []
+
+
+def heading_issues(levels):
+    """Jumps like <h2> straight to <h4>, which break the outline search engines read."""
+    issues = []
+    for previous, level in zip(levels, levels[1:]):
+        if level > previous + 1:
+            issues.append(f"<h{previous}> followed by <h{level}>")
+    return issues
+
+
+def analyze_html(html):
+    """Parse ``html`` once and return the facts the validators need."""
+    parser = _FactsParser()
+    parser.feed(html or "")
+    parser.close()
+    return HtmlFacts(
+        images=parser.images,
+        headings=parser.headings,
+        heading_issues=heading_issues(parser.headings),
+        broken_tags=parser.broken,
+        failure_markers=sorted(parser.markers),
+        text_chars=parser.text_chars,
+    )
+
+
+def article_facts(article, field, refresh=False):
+    """Facts for ``article[field]``, parsed once and kept on the article under ``html_facts``.
+
+    The stage that produces ``field`` passes ``refresh=True``; later stages reuse its result.
+    """
+    facts = article.setdefault("html_facts", {})
+    if refresh or field not in facts:
+        facts[field] = analyze_html(article.get(field))._asdict()
+    return facts[field]
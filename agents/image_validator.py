@@ -1,14 +1,16 @@
-from crewai import Agent
+from .base_agent import BaseAgent
+from .html_facts import article_facts
 
-class ImageValidator(Agent):
+class ImageValidator(BaseAgent):
     def run(self, articles):
         validated = []
 
         for a in articles:
-            if '<img' not in a["content"]:
+            facts = article_facts(a, "content", refresh=True)
+            if not facts["images"]:
                 print(f"⚠️ No image found in: {a['title']}")
             else:
-                print(f"🖼️ Image detected in: {a['title']}")
+                print(f"🖼️ {facts['images']} images detected in: {a['title']}")
             validated.append(a)
 
         print(f"✅ Total articles passed: {len(validated)}")
@@ -0,0 +1,75 @@
+import json
+import logging
+import os
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # "text" (event key=value) or "json" (one object per line)
+
+
+def _quote(value):
+    text = str(value)
+    if not text or any(c.isspace() or c in '"=' for c in text):
+        return json.dumps(text, ensure_ascii=False)
+    return text
+
+
+class StructuredFormatter(logging.Formatter):
+    def __init__(self, fmt="text"):
+        super().__init__()
+        self.as_json = fmt == "json"
+
+    def format(self, record):
+        fields = getattr(record, "fields", {})
+        if self.as_json:
+            return json.dumps({
+                "ts": self.formatTime(record),
+                "level": record.levelname,
+                "logger": record.name,
+                "event": record.getMessage(),
+                **fields,
+            }, ensure_ascii=False, default=str)
+        pairs = " ".join(f"{key}={_quote(value)}" for key, value in fields.items())
+        return f"{self.formatTime(record)} {record.levelname} {record.name} {record.getMessage()} {pairs}".rstrip()
+
+
+class EventLogger:
+    """Levelled logger that takes an event name plus key=value fields.
+
+    Fields are only formatted when the level is enabled, so debug events
+    cost nothing in a normal run.
+    """
+
+    def __init__(self, logger):
+        self.logger = logger
+
+    def _log(self, level, event, fields):
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, event, extra={"fields": fields})
+
+    def debug(self, event, **fields):
+        self._log(logging.DEBUG, event, fields)
+
+    def info(self, event, **fields):
+        self._log(logging.INFO, event, fields)
+
+    def warning(self, event, **fields):
+        self._log(logging.WARNING, event, fields)
+
+    def error(self, event, **fields):
+        self._log(logging.ERROR, event, fields)
+
+
+def get_logger(name):
+    return EventLogger(logging.getLogger(name))
+
+
+def configure_logging(level=LOG_LEVEL, fmt=LOG_FORMAT):
+    """Send every ``agents.*`` logger to stderr through the structured formatter (idempotent)."""
+    root = logging.getLogger("agents")
+    if not any(getattr(handler, "structured", False) for handler in root.handlers):
+        handler = logging.StreamHandler()
+        handler.structured = True
+        handler.setFormatter(StructuredFormatter(fmt))
+        root.addHandler(handler)
+    root.setLevel(level)
+    root.propagate = False
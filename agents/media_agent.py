@@ -0,0 +1,112 @@
+import io
+import os
+import re
+from html import unescape
+from concurrent.futures import ThreadPoolExecutor
+from .base_agent import BaseAgent
+from .metrics import metrics
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it images are rehosted as-is
+    Image = None
+
+MEDIA_WORKERS = int(os.getenv("MEDIA_WORKERS", "6"))  # Images downloaded/uploaded at once
+MEDIA_RECOMPRESS = os.getenv("MEDIA_RECOMPRESS", "0") == "1"  # Downscale + convert to WebP (needs Pillow)
+MEDIA_MAX_WIDTH = int(os.getenv("MEDIA_MAX_WIDTH", "1200"))
+MEDIA_WEBP_QUALITY = int(os.getenv("MEDIA_WEBP_QUALITY", "80"))
+
+IMG_SRC_RE = re.compile(r"""(<img\b[^>]*?\bsrc\s*=\s*)(["'])(.*?)\2""", re.I | re.S)
+
+# Fields whose HTML may embed images
+HTML_FIELDS = ("content", "translated_html")
+
+
+def image_sources(html):
+    """Raw ``src`` attribute values, still HTML-escaped (``&amp;``) as they appear in the markup."""
+    return [match.group(3) for match in IMG_SRC_RE.finditer(html or "")]
+
+
+def recompress_image(data, max_width=MEDIA_MAX_WIDTH, quality=MEDIA_WEBP_QUALITY):
+    """Downscale to ``max_width`` and re-encode as WebP; returns the original if that isn't smaller."""
+    if Image is None:
+        return data
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            if img.format in ("GIF", "WEBP") or getattr(img, "is_animated", False):
+                return data
+            if img.width > max_width:
+                img = img.resize((max_width, round(img.height * max_width / img.width)), Image.LANCZOS)
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+            out = io.BytesIO()
+            img.save(out, format="WEBP", quality=quality, method=4)
+    except Exception as e:
+        print(f"⚠️ Could not recompress image: {e}")
+        return data
+    smaller = out.getvalue()
+    return smaller if len(smaller) < len(data) else data
+
+
+class MediaAgent(BaseAgent):
+    """Rehosts every inline article image on WordPress and rewrites the <img src> attributes."""
+
+    def __init__(self, role, goal, backstory, wordpress_agent, workers=MEDIA_WORKERS, recompress=MEDIA_RECOMPRESS):
+        super().__init__(role, goal, backstory)
+        self.wordpress_agent = wordpress_agent  # Uploads go through its session and media cache
+        self.workers = max(1, workers)
+        self.recompress = recompress
+        if recompress and Image is None:
+            print("⚠️ MEDIA_RECOMPRESS is on but Pillow isn't installed; uploading images unchanged.")
+
+    def run(self, articles):
+        if not self.wordpress_agent.has_credentials():
+            print("⚠️ WordPress credentials missing; leaving inline images hotlinked.")
+            return articles
+
+        urls = []
+        seen = set()
+        for article in articles:
+            for field in HTML_FIELDS:
+                for src in image_sources(article.get(field)):
+                    if src.startswith("http") and src not in seen:
+                        seen.add(src)
+                        urls.append(src)
+
+        if not urls:
+            return articles
+
+        print(f"🖼️ Rehosting {len(urls)} inline images ({self.workers} at a time)...")
+        transform = recompress_image if self.recompress else None
+        # Warm the shared media cache before the workers use it
+        self.wordpress_agent.media_cache
+
+        def upload(src):
+            # Download the real URL; the raw src stays the key the rewrite below looks up
+            url = unescape(src)
+            try:
+                with metrics.timer("image_seconds"):
+                    return self.wordpress_agent.upload_image_to_wp(url, transform=transform)[1]
+            except Exception as e:
+                print(f"[Upload Exception] {url}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(urls))) as pool:
+            uploaded = dict(zip(urls, pool.map(upload, urls)))
+        self.wordpress_agent.media_cache.save()
+
+        # Only rewrite images that made it; failed ones keep their original src
+        rehosted = {url: new for url, new in uploaded.items() if new}
+        metrics.inc("images_total", len(rehosted), outcome="rehosted")
+        metrics.inc("images_total", len(urls) - len(rehosted), outcome="failed")
+
+        def rewrite(match):
+            return f"{match.group(1)}{match.group(2)}{rehosted.get(match.group(3), match.group(3))}{match.group(2)}"
+
+        for article in articles:
+            for field in HTML_FIELDS:
+                if article.get(field):
+                    article[field] = IMG_SRC_RE.sub(rewrite, article[field])
+
+        print(f"✅ Rehosted {len(rehosted)}/{len(urls)} images.")
+        return articles
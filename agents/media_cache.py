@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import threading
+
+from .article_store import atomic_write
+from .metrics import metrics
+
+WP_MEDIA_CACHE_FILE = os.getenv("WP_MEDIA_CACHE_FILE", "wp_media.json")
+
+# (magic bytes at offset 0, mime type, file extension)
+_SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png", "png"),
+    (b"GIF87a", "image/gif", "gif"),
+    (b"GIF89a", "image/gif", "gif"),
+    (b"BM", "image/bmp", "bmp"),
+]
+
+
+def sniff_image_type(data, fallback="image/jpeg"):
+    """Detect an image's mime type and extension from its bytes."""
+    for magic, mime, ext in _SIGNATURES:
+        if data.startswith(magic):
+            return mime, ext
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp", "webp"
+    if data[4:12] in (b"ftypavif", b"ftypavis"):
+        return "image/avif", "avif"
+    head = data[:256].lstrip().lower()
+    if head.startswith(b"<svg") or (head.startswith(b"<?xml") and b"<svg" in data[:1024].lower()):
+        return "image/svg+xml", "svg"
+    return fallback, fallback.split("/")[-1].replace("jpeg", "jpg")
+
+
+def content_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class MediaCache:
+    """Remembers which images are already in the WordPress media library.
+
+    Keyed both by source URL (skip the download entirely) and by content hash
+    (the same bytes found under a different URL skip the upload).
+    """
+
+    def __init__(self, path=WP_MEDIA_CACHE_FILE):
+        self.path = path
+        self.by_url = {}
+        self.by_hash = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.by_url = data.get("by_url", {})
+                self.by_hash = data.get("by_hash", {})
+            except Exception as e:
+                print(f"⚠️ Failed to load media cache {path}: {e}")
+
+    def lookup_url(self, url):
+        """(media id, source_url) for an image URL uploaded before, or None."""
+        with self._lock:
+            entry = self.by_url.get(url)
+            if entry is None:
+                self.misses += 1
+                metrics.inc("cache_lookups_total", cache="media_url", result="miss")
+                return None
+            self.hits += 1
+            metrics.inc("cache_lookups_total", cache="media_url", result="hit")
+            return entry["id"], entry["source_url"]
+
+    def lookup_digest(self, url, digest):
+        """(media id, source_url) for identical bytes uploaded before; remembers ``url`` for next time."""
+        with self._lock:
+            entry = self.by_hash.get(digest)
+            if entry is None:
+                metrics.inc("cache_lookups_total", cache="media_digest", result="miss")
+                return None
+            self.hits += 1
+            metrics.inc("cache_lookups_total", cache="media_digest", result="hit")
+            self.by_url[url] = dict(entry, sha256=digest)
+            return entry["id"], entry["source_url"]
+
+    def add(self, url, digest, media_id, source_url):
+        with self._lock:
+            self.by_hash[digest] = {"id": media_id, "source_url": source_url}
+            self.by_url[url] = {"id": media_id, "source_url": source_url, "sha256": digest}
+
+    def save(self):
+        with self._lock:
+            data = {"by_url": self.by_url, "by_hash": self.by_hash}
+            atomic_write(self.path, lambda f: json.dump(data, f, indent=1))
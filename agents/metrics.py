@@ -0,0 +1,195 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from .article_store import atomic_write
+
+METRICS_REPORT_FILE = os.getenv("METRICS_REPORT_FILE", "run_report.json")  # JSON run report; "" to skip
+METRICS_PROM_FILE = os.getenv("METRICS_PROM_FILE", "")  # Prometheus textfile-collector file; "" to skip
+METRICS_PREFIX = "tutorial_pipeline_"
+
+# Seconds: wide enough for a cache hit at one end and a slow Gemini call at the other
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (Prometheus ``le`` buckets) with count, sum and max."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (the max for the +Inf bucket)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 4),
+            "mean": round(self.sum / self.count, 4) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": round(self.max, 4),
+        }
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Metrics:
+    """Thread-safe registry of counters, gauges and histograms for one run.
+
+    Every series is a metric name plus labels, e.g.
+    ``metrics.inc("api_requests_total", api="gemini", status=429)``. The run
+    can be exported as a JSON report and/or a Prometheus textfile.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.gauges = {}
+            self.histograms = {}
+            self.started_at = time.time()
+
+    def inc(self, name, amount=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self.gauges[_key(name, labels)] = value
+
+    def observe(self, name, value, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe the seconds spent in the ``with`` block, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def counter_value(self, name, **labels):
+        with self._lock:
+            return self.counters.get(_key(name, labels), 0)
+
+    def cache_hit_rates(self):
+        """Hit rate per ``cache`` label of ``cache_lookups_total``."""
+        totals = {}
+        with self._lock:
+            for (name, labels), value in self.counters.items():
+                if name != "cache_lookups_total":
+                    continue
+                labels = dict(labels)
+                hits, lookups = totals.get(labels.get("cache"), (0, 0))
+                hits += value if labels.get("result") == "hit" else 0
+                totals[labels.get("cache")] = (hits, lookups + value)
+        return {cache: round(hits / lookups, 3) for cache, (hits, lookups) in totals.items() if lookups}
+
+    def report(self):
+        def series(store, render):
+            out = {}
+            for (name, labels), value in sorted(store.items()):
+                out.setdefault(name, []).append({"labels": dict(labels), "value": render(value)})
+            return out
+
+        with self._lock:
+            report = {
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+                "duration_seconds": round(time.time() - self.started_at, 3),
+                "counters": series(self.counters, lambda v: round(v, 4) if isinstance(v, float) else v),
+                "gauges": series(self.gauges, lambda v: v),
+                "histograms": series(self.histograms, Histogram.summary),
+            }
+        report["cache_hit_rates"] = self.cache_hit_rates()
+        return report
+
+    def prometheus(self):
+        """The run in the Prometheus text exposition format."""
+        def fmt(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + "}"
+
+        lines = []
+        with self._lock:
+            for kind, store in (("counter", self.counters), ("gauge", self.gauges)):
+                typed = set()
+                for (name, labels), value in sorted(store.items()):
+                    metric = METRICS_PREFIX + name
+                    if metric not in typed:
+                        typed.add(metric)
+                        lines.append(f"# TYPE {metric} {kind}")
+                    lines.append(f"{metric}{fmt(labels)} {value}")
+
+            typed = set()
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                metric = METRICS_PREFIX + name
+                if metric not in typed:
+                    typed.add(metric)
+                    lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    lines.append(f"{metric}_bucket{fmt(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{metric}_sum{fmt(labels)} {histogram.sum}")
+                lines.append(f"{metric}_count{fmt(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, json_path=METRICS_REPORT_FILE, prom_path=METRICS_PROM_FILE):
+        self.set("run_duration_seconds", round(time.time() - self.started_at, 3))
+        if json_path:
+            report = self.report()
+            atomic_write(json_path, lambda f: json.dump(report, f, indent=2))
+            print(f"📊 Run report written to {json_path}")
+        if prom_path:
+            text = self.prometheus()
+            atomic_write(prom_path, lambda f: f.write(text))
+            print(f"📊 Prometheus metrics written to {prom_path}")
+
+
+# Shared by every agent in the process
+metrics = Metrics()
@@ -0,0 +1,128 @@
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from .checkpoint_store import RETRY_STAGES
+from .metrics import metrics
+
+# fn takes one article and returns the list of articles to pass downstream
+# (empty to drop it). workers is how many copies of the stage run at once.
+Stage = namedtuple("Stage", ["name", "fn", "workers"])
+
+_DONE = object()
+
+
+def agent_stage(name, agent, workers=1):
+    """Wrap a batch agent's ``run(articles)`` so it handles one article at a time."""
+    return Stage(name, lambda article: agent.run([article]) or [], workers)
+
+
+def side_effect_stage(name, fn, workers=1):
+    """Run ``fn(article)`` for its side effect and always pass the article on."""
+    def run(article):
+        fn(article)
+        return [article]
+    return Stage(name, run, workers)
+
+
+def checkpointed(stage, checkpoints, last=False):
+    """Record every article's progress in ``checkpoints`` once ``stage`` has handled it.
+
+    Articles the stage drops are forgotten, unless it is one of
+    ``RETRY_STAGES``, and so is everything coming out of the ``last`` stage,
+    since there is nothing left to resume.
+    """
+    def run(article):
+        results = stage.fn(article)
+        if not results and stage.name in RETRY_STAGES:
+            return results  # Still checkpointed at the previous stage
+        if last or not results:
+            checkpoints.forget([article] + list(results))
+        else:
+            checkpoints.record(stage.name, results)
+        return results
+    return stage._replace(fn=run)
+
+
+class StreamingPipeline:
+    """Pushes each article through every stage as soon as it is ready.
+
+    Stages are connected by bounded queues, so a slow stage makes the ones
+    before it wait instead of piling up work in memory. An exception while
+    processing one article is logged and only drops that article.
+    """
+
+    def __init__(self, stages, queue_size=2):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.stats = {stage.name: {"in": 0, "out": 0, "errors": 0} for stage in stages}
+        self._lock = threading.Lock()
+
+    def _count(self, stage, key, amount=1):
+        with self._lock:
+            self.stats[stage.name][key] += amount
+
+    def run(self, source):
+        """Consume ``source`` (any iterable of articles); returns how many made it through."""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        threads = [threading.Thread(target=self._feed, args=(source, queues[0]), daemon=True)]
+
+        for i, stage in enumerate(self.stages):
+            remaining = [max(1, stage.workers)]
+            for _ in range(remaining[0]):
+                threads.append(threading.Thread(
+                    target=self._work, args=(stage, queues[i], queues[i + 1], remaining), daemon=True
+                ))
+
+        for t in threads:
+            t.start()
+
+        completed = 0
+        sink = queues[-1]
+        while True:
+            item = sink.get()
+            if item is _DONE:
+                break
+            completed += 1
+
+        for t in threads:
+            t.join()
+        return completed
+
+    def _feed(self, source, out):
+        try:
+            for article in source:
+                out.put(article)
+        except Exception as e:
+            print(f"❌ ERROR in pipeline source: {e}")
+        finally:
+            out.put(_DONE)
+
+    def _work(self, stage, inbox, out, remaining):
+        while True:
+            article = inbox.get()
+            if article is _DONE:
+                # Let sibling workers see the end marker too; the last one passes it on
+                inbox.put(_DONE)
+                with self._lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    out.put(_DONE)
+                return
+
+            self._count(stage, "in")
+            start = time.perf_counter()
+            try:
+                results = stage.fn(article)
+            except Exception as e:
+                self._count(stage, "errors")
+                metrics.inc("stage_errors_total", stage=stage.name)
+                print(f"❌ ERROR in {stage.name} for {article.get('url', '?')}: {e}")
+                continue
+            finally:
+                metrics.observe("stage_seconds", time.perf_counter() - start, stage=stage.name)
+            for result in results:
+                self._count(stage, "out")
+                out.put(result)
@@ -0,0 +1,73 @@
+import os
+import re
+
+# URLs at least this long are swapped for a placeholder before translation
+PLACEHOLDER_URL_MIN_CHARS = int(os.getenv("PLACEHOLDER_URL_MIN_CHARS", "40"))
+
+IMG_TAG_RE = re.compile(r"<img\b[^>]*>", re.I)
+URL_ATTR_RE = re.compile(r"""(\b(?:href|src)\s*=\s*)(["'])(.*?)\2""", re.I | re.S)
+BARE_URL_RE = re.compile(r"""https?://[^\s<>"']+""")
+PLACEHOLDER_RE = re.compile(r"\[\[(?:IMG|URL)_\d+\]\]")
+
+# Appended to every system instruction that receives compacted HTML
+PLACEHOLDER_RULE = (
+    "Placeholders like [[IMG_1]] stand for images and [[URL_1]] for links. "
+    "Copy every placeholder exactly as written, once, in the same position. Never translate or drop them.\n"
+)
+
+
+def compact_html(html, min_url_chars=PLACEHOLDER_URL_MIN_CHARS):
+    """Swap ``<img>`` tags and long URLs for short placeholders the model just copies.
+
+    Returns ``(text, placeholders)``; pass both to ``restore_html`` after
+    translation. Numbering is deterministic, and a URL used twice gets the
+    same placeholder.
+    """
+    placeholders = {}
+    by_value = {}
+    counts = {"IMG": 0, "URL": 0}
+
+    def placeholder(kind, value):
+        key = by_value.get((kind, value))
+        if key is None:
+            counts[kind] += 1
+            key = f"[[{kind}_{counts[kind]}]]"
+            placeholders[key] = value
+            by_value[(kind, value)] = key
+        return key
+
+    text = IMG_TAG_RE.sub(lambda m: placeholder("IMG", m.group(0)), html or "")
+
+    def attr(match):
+        value = match.group(3)
+        if len(value) < min_url_chars:
+            return match.group(0)
+        return f"{match.group(1)}{match.group(2)}{placeholder('URL', value)}{match.group(2)}"
+
+    text = URL_ATTR_RE.sub(attr, text)
+    text = BARE_URL_RE.sub(
+        lambda m: placeholder("URL", m.group(0)) if len(m.group(0)) >= min_url_chars else m.group(0), text
+    )
+    return text, placeholders
+
+
+def restore_html(text, placeholders):
+    """Put the originals back; returns ``(html, missing)``.
+
+    Placeholders the model invented are removed. Images it dropped are
+    appended at the end so none are lost; ``missing`` lists every
+    placeholder that didn't come back.
+    """
+    returned = set()
+
+    def restore(match):
+        key = match.group(0)
+        if key not in placeholders:
+            return ""
+        returned.add(key)
+        return placeholders[key]
+
+    html = PLACEHOLDER_RE.sub(restore, text or "")
+    missing = [key for key in placeholders if key not in returned]
+    html += "".join(placeholders[key] for key in missing if key.startswith("[[IMG_"))
+    return html, missing
@@ -0,0 +1,76 @@
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class HostRateLimiter:
+    """Spaces out requests to the same host by at least ``min_interval`` seconds.
+
+    Safe to share between threads; callers for different hosts never wait on
+    each other.
+    """
+
+    def __init__(self, min_interval=1.0):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, bursts up to ``capacity``.
+
+    ``acquire`` blocks until the requested amount is available. Requests larger
+    than the whole bucket are clamped so they can't wait forever.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, limit):
+        return cls(rate=limit / 60.0, capacity=limit)
+
+    def acquire(self, amount=1):
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+def retry_delay(attempt, response=None, cap=60):
+    """Seconds to wait before retry number ``attempt`` (0-based).
+
+    Honours a numeric ``Retry-After`` header when the server sent one, otherwise
+    uses exponential backoff with full jitter.
+    """
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            return min(cap, float(retry_after))
+        except ValueError:
+            pass
+    return random.uniform(0, min(cap, 2 ** attempt))
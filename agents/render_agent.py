@@ -1,21 +1,42 @@
-from pydantic import BaseModel
+from html import escape
+from string import Template
+from .base_agent import BaseAgent
+from .html_facts import article_facts
 
-class RenderAgent(BaseModel):
-    role: str
-    goal: str
-    backstory: str
+# Compiled once at import; title and URL are escaped, the translated body is inserted as-is
+FINAL_HTML_TEMPLATE = Template(
+    "<h1>$title</h1>\n"
+    '<p><a href="$url">Original Article Link</a></p>\n'
+    "$body\n"
+)
+
+class RenderAgent(BaseAgent):
+    def __init__(self, role, goal, backstory, translator_agent=None):
+        super().__init__(role, goal, backstory)
+        # Articles that reach rendering without translated_html go through translator_agent first
+        self.translator_agent = translator_agent
 
     def run(self, articles):
         print("🔎 Rendering articles into final HTML structure...")
         rendered_articles = []
 
+        missing = [a for a in articles if not a.get('translated_html')]
+        if missing and self.translator_agent is not None:
+            print(f"🔄 Translating {len(missing)} untranslated articles before rendering...")
+            self.translator_agent.run(missing)  # Updates the article dicts in place
+
         for article in articles:
-            rendered_html = f"""
-                <h1>{article['title']}</h1>
-                <p><a href="{article['url']}">Original Article Link</a></p>
-                {article['translated_html']}
-            """
-            article['final_html'] = rendered_html
+            body = article.get('translated_html')
+            if not body:
+                print(f"🚫 Not rendered, no translation: {article.get('url', '?')}")
+                continue
+            article['final_html'] = FINAL_HTML_TEMPLATE.substitute(
+                title=escape(article['title'], quote=False),
+                url=escape(article['url']),
+                body=body,
+            )
+            # The one parse of the body; the validators read these facts instead of the HTML
+            article_facts(article, 'translated_html', refresh=True)
             rendered_articles.append(article)
 
         print(f"✅ Rendered {len(rendered_articles)} articles.")
@@ -1,32 +1,63 @@
-from crewai import Agent
-import json
 from datetime import datetime
-import os
-
-class SaverAgent(Agent):
-    def run(self, articles):
-        filename = "translated_articles.json"
-        all_articles = []
-
-        # ✅ Load existing if file exists
-        if os.path.exists(filename):
-            with open(filename, "r", encoding="utf-8") as f:
-                try:
-                    existing_data = json.load(f)
-                    all_articles = existing_data.get("articles", [])
-                except Exception as e:
-                    print(f"⚠️ Failed to load existing file: {e}")
-
-        # ✅ Add new ones with timestamp
-        for article in articles:
-            article["saved_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            all_articles.append(article)
-
-        # ✅ Save all into same file
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump({
-                "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "articles": all_articles
-            }, f, ensure_ascii=False, indent=4)
-
-        print(f"✅ Appended & saved {len(articles)} new articles to {filename}")
+from .article_store import LEGACY_ARTICLES_FILE, ArticleStore
+from .base_agent import BaseAgent
+from .dedup_index import NearDuplicateIndex, index_lock
+from .seen_index import SeenIndex
+
+class SaverAgent(BaseAgent):
+    def __init__(self, role, goal, backstory):
+        super().__init__(role, goal, backstory)
+        self._unindexed = []  # Saved with export=False; indexed by the next export()
+
+    def run(self, articles, export=True):
+        store = ArticleStore()
+
+        # ✅ Upsert new ones with timestamp; cost depends only on how many are new
+        try:
+            for article in articles:
+                article["saved_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                store.upsert(article)
+
+            # ✅ Refresh the feed pages index.html reads (skipped per article when streaming).
+            # Only pages with new articles are rewritten; the full JSON archive is `main.py export`.
+            if export:
+                store.export_feed()
+        finally:
+            store.close()
+
+        print(f"✅ Saved {len(articles)} new articles to {store.path}" + (" and refreshed the feed" if export else ""))
+
+        # ✅ Streaming saves one article at a time; the index files are rewritten once, in export()
+        if export:
+            self._update_indexes(articles)
+        else:
+            self._unindexed.extend(articles)
+
+    def _update_indexes(self, articles):
+        """Remember what was saved (and any duplicates merged into it) so the next run's scraper
+        can skip it and its near-duplicates are caught before translation."""
+        if not articles:
+            return
+        with index_lock:
+            seen = SeenIndex()
+            near_duplicates = NearDuplicateIndex()
+            for article in articles:
+                seen.mark(article)
+                for duplicate in article.get("duplicates", []):
+                    seen.mark(duplicate)
+                near_duplicates.add(article)
+            seen.save()
+            near_duplicates.save()
+
+    def export(self, archive=False):
+        """Index what streaming saved and refresh the feed; ``archive=True`` also rewrites the full JSON archive."""
+        self._update_indexes(self._unindexed)
+        self._unindexed = []
+        store = ArticleStore()
+        try:
+            store.export_feed()
+            if archive:
+                store.export_json()
+        finally:
+            store.close()
+        print(f"✅ Exported feed{' and ' + LEGACY_ARTICLES_FILE if archive else ''} from {store.path}")
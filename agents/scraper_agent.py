@@ -1,80 +1,228 @@
-from crewai import Agent
-import undetected_chromedriver as uc
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from bs4 import BeautifulSoup
+from .base_agent import BaseAgent
+from .browser_pool import BrowserPool
+from .dedup_index import index_lock
+from .extractors import get_extractor, is_complete
+from .fetcher import TieredFetcher
+from .metrics import metrics
+from .rate_limit import HostRateLimiter
+from .seen_index import SeenIndex, content_hash
 
-class ScraperAgent(Agent):
-    def run(self):
-        BASE_URL = "https://www.mexc.co"
+BASE_URL = os.getenv("SCRAPER_BASE_URL", "https://www.mexc.co")
+
+# Long-lived headless browsers shared by every page load in a run
+BROWSER_POOL_SIZE = int(os.getenv("SCRAPER_BROWSER_POOL_SIZE", "1"))
+BROWSER_MAX_PAGES = int(os.getenv("SCRAPER_BROWSER_MAX_PAGES", "25"))  # Recycle a browser after this many pages
+
+# Article workers pulling links off a shared queue
+SCRAPER_WORKERS = int(os.getenv("SCRAPER_WORKERS", str(BROWSER_POOL_SIZE)))
+SCRAPER_HOST_INTERVAL = float(os.getenv("SCRAPER_HOST_INTERVAL", "0.5"))  # Min seconds between hits to one host
+
+# Try a plain HTTP GET before rendering in Chrome; set to 0 to always use the browser
+SCRAPER_HTTP_FIRST = os.getenv("SCRAPER_HTTP_FIRST", "1") == "1"
+
+# Skip articles already processed in earlier runs unless they changed; set to 0 to re-scrape everything
+SCRAPER_INCREMENTAL = os.getenv("SCRAPER_INCREMENTAL", "1") == "1"
+
+# "lxml" walks the article container once; "bs4" is the original find_all extractor
+SCRAPER_EXTRACTOR = os.getenv("SCRAPER_EXTRACTOR", "lxml")
+
+# Listing pages to crawl: "16", "1-20", "1-5,9", or "auto" to follow pagination from page 1
+# until a page turns up nothing new (only links already known or already found)
+SCRAPER_LISTING_PAGES = os.getenv("SCRAPER_LISTING_PAGES", "16")
+SCRAPER_LISTING_WORKERS = int(os.getenv("SCRAPER_LISTING_WORKERS", "4"))  # Listing pages fetched at once
+SCRAPER_MAX_LISTING_PAGES = int(os.getenv("SCRAPER_MAX_LISTING_PAGES", "200"))  # Safety stop for "auto"
+
+
+def parse_page_spec(spec):
+    """Page numbers for a spec like "16", "1-20" or "1-5,9"; None for "auto"."""
+    spec = spec.strip().lower()
+    if spec == "auto":
+        return None
+    pages = []
+    for part in spec.split(","):
+        first, _, last = part.strip().partition("-")
+        pages.extend(range(int(first), int(last or first) + 1))
+    return list(dict.fromkeys(pages))
+
+class ScraperAgent(BaseAgent):
+    def run(self, on_article=None):
+        """Scrape every article and return them in listing order.
+
+        ``on_article(article)`` is called as each one finishes, e.g. to checkpoint it.
+        """
+        scraped = []
+        for idx, article in self._iter_scraped():
+            if on_article is not None:
+                on_article(article)
+            scraped.append((idx, article))
+        # Keep listing order regardless of which worker finished first
+        scraped.sort(key=lambda pair: pair[0])
+        return [article for _, article in scraped]
+
+    def iter_articles(self):
+        """Yield each article as soon as it is scraped, in completion order."""
+        for _, article in self._iter_scraped():
+            yield article
+
+    def _iter_scraped(self):
+        with BrowserPool(size=max(BROWSER_POOL_SIZE, SCRAPER_WORKERS), max_pages=BROWSER_MAX_PAGES) as pool:
+            fetcher = TieredFetcher(pool, http_first=SCRAPER_HTTP_FIRST, pool_size=max(1, SCRAPER_WORKERS))
+            try:
+                yield from self._scrape(fetcher)
+            finally:
+                fetcher.close()
+                print(f"🧭 Fetch tiers: {fetcher.stats} | Browser pool: {pool.stats}")
+
+    def _scrape(self, fetcher):
         print("Scraping articles...")
+        extractor = get_extractor(SCRAPER_EXTRACTOR)
+        limiter = HostRateLimiter(SCRAPER_HOST_INTERVAL)
+        seen = SeenIndex() if SCRAPER_INCREMENTAL else None
+        skipped = []
 
         # Step 1: Get the list of article links
-        options_main = uc.ChromeOptions()
-        options_main.add_argument('--headless')
-        options_main.add_argument('--no-sandbox')
-        options_main.add_argument('--disable-dev-shm-usage')
-        driver = uc.Chrome(options=options_main)
+        links = self._discover_links(fetcher, limiter, seen)
+        print(f"✅ Found {len(links)} articles.")
+
+        # Step 2: Scrape each article, SCRAPER_WORKERS at a time. Finished articles are
+        # handed back through a bounded queue so a slow consumer throttles the workers.
+        workers = max(1, SCRAPER_WORKERS)
+        jobs = queue.Queue()
+        for idx, link in enumerate(links):
+            jobs.put((idx, link))
+        done = queue.Queue(maxsize=workers * 2)
 
-        driver.get(f"{BASE_URL}/learn/trading-guide?page=16")
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        driver.quit()
+        def worker():
+            while True:
+                try:
+                    idx, link = jobs.get_nowait()
+                except queue.Empty:
+                    done.put(None)
+                    return
+                print(f"🔎 Scraping article {idx+1}/{len(links)}: {link}")
+                try:
+                    limiter.wait(link)
+                    start = time.perf_counter()
+                    article = self._scrape_article(fetcher, extractor, link, seen)
+                    metrics.observe("article_seconds", time.perf_counter() - start, stage="scrape")
+                    if article is not None:
+                        metrics.inc("articles_total", stage="scrape", outcome="scraped")
+                        done.put((idx, article))
+                    else:
+                        metrics.inc("articles_total", stage="scrape", outcome="skipped")
+                        if seen is not None and link in seen:
+                            skipped.append(link)
+                except Exception as e:
+                    metrics.inc("articles_total", stage="scrape", outcome="failed")
+                    print(f"❌ Failed to scrape {link}: {e}")
 
+        for _ in range(workers):
+            threading.Thread(target=worker, daemon=True).start()
+
+        scraped = 0
+        running = workers
+        while running:
+            item = done.get()
+            if item is None:
+                running -= 1
+                continue
+            scraped += 1
+            yield item
+
+        if seen is not None:
+            with index_lock:
+                seen.save_baselines()
+        if skipped:
+            print(f"⏭️ Skipped {len(skipped)} already-processed articles with no changes.")
+        print(f"✅ Scraping completed. Total articles scraped: {scraped}")
+
+    def _scrape_article(self, fetcher, extractor, link, seen=None):
+        etag, last_modified = seen.validators(link) if seen is not None else (None, None)
+        result = fetcher.fetch(
+            link,
+            parse=lambda html: extractor.extract(html, link),
+            complete=is_complete,
+            etag=etag,
+            last_modified=last_modified,
+        )
+        print(f"📡 Served by {result.tier} ({result.status}): {link}")
+        if result.status == 304:
+            print(f"⏭️ Not modified since last run: {link}")
+            return None
+
+        article = result.doc
+        if article is None:
+            print(f"⚠️ No <h1> found, skipping: {link}")
+            return None
+
+        article["content_hash"] = content_hash(article)
+        article["etag"] = result.etag
+        article["last_modified"] = result.last_modified
+        if seen is not None and seen.is_unchanged(link, article["content_hash"]):
+            print(f"⏭️ Content unchanged since last run: {link}")
+            return None
+        return article
+
+    def _discover_links(self, fetcher, limiter, seen=None):
+        """Crawl the listing pages, SCRAPER_LISTING_WORKERS at a time, into one de-duplicated link list."""
+        pages = parse_page_spec(SCRAPER_LISTING_PAGES)
+        workers = max(1, SCRAPER_LISTING_WORKERS)
+        links = []
+        found = set()
+
+        def add(page_links):
+            new = [link for link in page_links if link not in found]
+            found.update(new)
+            links.extend(new)
+            return new
+
+        def fetch_page(page):
+            listing_url = f"{BASE_URL}/learn/trading-guide?page={page}"
+            limiter.wait(listing_url)
+            try:
+                page_links = fetcher.fetch(listing_url, parse=self._listing_links).doc or []
+            except Exception as e:
+                print(f"❌ Failed to load listing page {page}: {e}")
+                page_links = []
+            metrics.inc("listing_pages_total")
+            return page_links
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            if pages is not None:
+                for page_links in pool.map(fetch_page, pages):
+                    add(page_links)
+                print(f"📚 Crawled {len(pages)} listing pages.")
+                return links
+
+            # "auto": fetch pages in waves and stop after the first page with nothing new on it
+            page = 1
+            while page <= SCRAPER_MAX_LISTING_PAGES:
+                wave = range(page, min(page + workers, SCRAPER_MAX_LISTING_PAGES + 1))
+                exhausted = False
+                for page_links in pool.map(fetch_page, wave):
+                    new = add(page_links)
+                    if not any(seen is None or link not in seen for link in new):
+                        exhausted = True
+                        break
+                page = wave[-1] + 1
+                if exhausted:
+                    break
+        print(f"📚 Crawled {page - 1} listing pages until no new articles turned up.")
+        return links
+
+    def _listing_links(self, html):
+        soup = BeautifulSoup(html, "html.parser")
         links = []
+        found = set()
         for a in soup.select('a[href^="/learn"]'):
             full_link = BASE_URL + a.get('href')
-            if full_link not in links and "trading-guide" not in full_link:
+            if full_link not in found and "trading-guide" not in full_link:
+                found.add(full_link)
                 links.append(full_link)
-
-        print(f"✅ Found {len(links)} articles.")
-
-        # Step 2: Scrape each article
-        articles = []
-        for idx, link in enumerate(links):
-            print(f"🔎 Scraping article {idx+1}/{len(links)}: {link}")
-
-            # Fresh ChromeOptions object for each driver session
-            options = uc.ChromeOptions()
-            options.add_argument('--headless')
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            driver = uc.Chrome(options=options)
-
-            driver.get(link)
-            page_soup = BeautifulSoup(driver.page_source, "html.parser")
-            driver.quit()
-
-            title = page_soup.find("h1").text.strip()
-            content_blocks = []
-
-            # Extract structured content in order (including <span> and <img>)
-            for elem in page_soup.find_all(['h2', 'h3', 'p', 'ul', 'blockquote', 'pre', 'span', 'img']):
-                if elem.name in ['h2', 'h3']:
-                    content_blocks.append(f"<h2>{elem.get_text(strip=True)}</h2>")
-                elif elem.name == 'p':
-                    content_blocks.append(f"<p>{elem.get_text(strip=True)}</p>")
-                elif elem.name == 'ul':
-                    ul_content = "<ul>" + "".join(f"<li>{li.get_text(strip=True)}</li>" for li in elem.find_all('li')) + "</ul>"
-                    content_blocks.append(ul_content)
-                elif elem.name == 'blockquote':
-                    content_blocks.append(f"<blockquote>{elem.get_text(strip=True)}</blockquote>")
-                elif elem.name == 'pre':
-                    content_blocks.append(f"<pre>{elem.get_text(strip=True)}</pre>")
-                elif elem.name == 'span':
-                    # Add span text if meaningful
-                    text = elem.get_text(strip=True)
-                    if text:
-                        content_blocks.append(f"<p>{text}</p>")
-                elif elem.name == 'img':
-                    src = elem.get('src')
-                    if src:
-                        if src.startswith('/'):
-                            src = BASE_URL + src
-                        content_blocks.append(f'<img src="{src}" alt="tutorial image" />')
-
-            articles.append({
-                "url": link,
-                "title": title,
-                "content": "".join(content_blocks)
-            })
-
-        print(f"✅ Scraping completed. Total articles scraped: {len(articles)}")
-        return articles
+        return links
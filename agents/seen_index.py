@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+from .article_store import load_saved_articles
+
+SEEN_INDEX_FILE = os.getenv("SEEN_INDEX_FILE", "seen_articles.json")
+
+
+def content_hash(article):
+    """Stable hash of the scraped title + content, used to spot changed articles."""
+    raw = f"{article.get('title', '')}\n{article.get('content', '')}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SeenIndex:
+    """Persistent record of every article URL already pushed through the pipeline.
+
+    Each entry keeps the content hash plus the ETag / Last-Modified validators
+    from the last fetch, so the scraper can skip unchanged pages cheaply. If the
+    index file doesn't exist yet it is seeded from the saved article history.
+    """
+
+    def __init__(self, path=SEEN_INDEX_FILE, seed=True):
+        self.path = path
+        self.entries = {}
+        self.baselines = {}  # URL -> content hash first scraped for a seeded entry
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f).get("urls", {})
+            except Exception as e:
+                print(f"⚠️ Failed to load seen index {path}: {e}")
+        elif seed:
+            self._seed()
+
+    def _seed(self):
+        # No hash or validators: the saved content may come from an older extractor, so hashing
+        # it would make every seeded article look changed. is_unchanged takes a baseline instead.
+        seen_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        for article in load_saved_articles("seen index"):
+            self.entries[article["url"]] = {"content_hash": None, "etag": None, "last_modified": None, "seen_at": seen_at}
+        if self.entries:
+            print(f"🗂️ Seeded seen index with {len(self.entries)} saved URLs")
+
+    def __contains__(self, url):
+        return url in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, url):
+        return self.entries.get(url)
+
+    def validators(self, url):
+        """ETag / Last-Modified from the last time ``url`` was saved, if any."""
+        entry = self.entries.get(url) or {}
+        return entry.get("etag"), entry.get("last_modified")
+
+    def is_unchanged(self, url, digest):
+        entry = self.entries.get(url)
+        if entry is None:
+            return False
+        if entry.get("content_hash") is None:
+            # Seeded without a hash: count it as unchanged and keep today's hash as the baseline
+            with self._lock:
+                self.baselines[url] = digest
+            return True
+        return entry.get("content_hash") == digest
+
+    def save_baselines(self):
+        """Write the baselines taken by ``is_unchanged`` into the index file on disk.
+
+        Reloads the file first, so entries other stages saved meanwhile are kept.
+        """
+        with self._lock:
+            baselines = dict(self.baselines)
+        if not baselines:
+            return
+        on_disk = SeenIndex(self.path)
+        for url, digest in baselines.items():
+            entry = on_disk.entries.get(url)
+            if entry is not None and entry.get("content_hash") is None:
+                entry["content_hash"] = digest
+        on_disk.save()
+        print(f"🗂️ Recorded baseline hashes for {len(baselines)} seeded articles")
+
+    def mark(self, article):
+        with self._lock:
+            self.entries[article["url"]] = {
+                "content_hash": article.get("content_hash") or content_hash(article),
+                "etag": article.get("etag"),
+                "last_modified": article.get("last_modified"),
+                "seen_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            }
+
+    def save(self):
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"urls": self.entries}, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
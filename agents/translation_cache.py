@@ -0,0 +1,109 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from .metrics import metrics
+
+TRANSLATION_CACHE_FILE = os.getenv("TRANSLATION_CACHE_FILE", "translation_cache.db")
+TRANSLATION_CACHE_MAX_ENTRIES = int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", "5000"))
+
+
+def template_hash(template):
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+
+
+def cache_key(model, template, text):
+    """Content address of one translation: same model + prompt + input -> same key."""
+    raw = "\0".join([model, template, text])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    """On-disk SQLite cache of Gemini translations with LRU eviction.
+
+    Rows remember which prompt template produced them, so editing a prompt
+    drops the stale entries for that kind via ``invalidate_stale``.
+    """
+
+    def __init__(self, path=TRANSLATION_CACHE_FILE, max_entries=TRANSLATION_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " key TEXT PRIMARY KEY,"
+            " kind TEXT NOT NULL,"
+            " template_hash TEXT NOT NULL,"
+            " model TEXT NOT NULL,"
+            " output TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_last_used ON translations (last_used)")
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT output FROM translations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                metrics.inc("cache_lookups_total", cache="translation", result="miss")
+                return None
+            self.hits += 1
+            metrics.inc("cache_lookups_total", cache="translation", result="hit")
+            self._conn.execute("UPDATE translations SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key, output, kind, template, model):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations (key, kind, template_hash, model, output, created_at, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, kind, template_hash(template), model, output, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM translations WHERE key IN"
+                " (SELECT key FROM translations ORDER BY last_used ASC LIMIT ?)",
+                (excess,),
+            )
+
+    def invalidate_stale(self, kind, template):
+        """Drop entries of ``kind`` produced by any prompt template other than ``template``."""
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM translations WHERE kind = ? AND template_hash != ?",
+                (kind, template_hash(template)),
+            )
+            self._conn.commit()
+        if cur.rowcount:
+            print(f"🧹 Dropped {cur.rowcount} cached '{kind}' translations from an old prompt template.")
+        return cur.rowcount
+
+    def stats(self):
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": size,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,120 +1,150 @@
-import requests
+import json
 import os
-import time
 from .base_agent import BaseAgent  # Import base class
+from .html_chunker import chunk_html
+from .gemini_client import GeminiClient
+from .prompt_builder import PLACEHOLDER_RULE, compact_html, restore_html
+from .translation_cache import TranslationCache, TRANSLATION_CACHE_FILE, cache_key
+
+GEMINI_MODEL = "gemini-2.0-flash"
+
+# Static instructions, sent as the Gemini systemInstruction; the user turn is only the text to translate.
+# Editing any of them invalidates its cached translations.
+TITLE_PROMPT = (
+    "Translate the title the user sends into Malay (Bahasa Malaysia).\n"
+    "Only return the translated text without any explanation. Maintain crypto and trading topic related word in english in double quotes\n"
+    "Keep it simple, relaxed, and easy to understand.\n"
+    "Avoid using exaggerated slang words or interjections.\n"
+    "Do not translate brand names or product names.\n"
+)
+
+# Many titles in one request; each translation is cached as if it came from TITLE_PROMPT
+TITLE_BATCH_PROMPT = (
+    "Translate each title in the JSON array the user sends into Malay (Bahasa Malaysia).\n"
+    "Maintain crypto and trading topic related word in english in double quotes\n"
+    "Keep it simple, relaxed, and easy to understand.\n"
+    "Avoid using exaggerated slang words or interjections.\n"
+    "Do not translate brand names or product names.\n"
+    "Return ONLY a JSON array of strings with exactly one translated title per input title, in the same order. "
+    "No explanation and no code fences.\n"
+)
+
+_CONTENT_RULES = (
+    "DO the following:\n"
+    "1. Translate all paragraph content into natural, fluent Bahasa Malaysia — make it sound like a real Malaysian crypto educator.\n"
+    "2. Use informal but professional tone (not textbook or robotic).\n"
+    "3. Retain the HTML structure, including <h1>, <h2>, <p>, <ul>, <ol>, <li>. " + PLACEHOLDER_RULE +
+    "4. Keep all crypto and trading terms (e.g., futures, wallet, margin, liquidation) in English inside double quotes.\n"
+    "5. Then highlight those double-quoted terms by wrapping them with <strong>. Example: <strong>\"wallet\"</strong>.\n"
+    "6. Break long paragraphs into shorter ones for better readability.\n"
+    "7. Avoid repeating phrases — write concisely but clearly.\n"
+    "8. Translate into Bahasa Malaysia — NOT Bahasa Indonesia. Use 'anda', 'modal', 'untung', 'kerugian', 'dagangan', etc.\n\n"
+    "9. As for the SEO make sure follow the correct heading structure.\n"
+)
+
+_CONCLUSION_RULES = (
+    "At the end of the article, write a short 1-paragraph conclusion (max 280 characters) in Bahasa Malaysia.\n"
+    "The conclusion should:\n"
+    "- Be written like a general observation or takeaway, NOT as a news source or formal summary.\n"
+    "- Use a natural, conversational, friendly Malaysian tone — like a friend sharing info.\n"
+    "- Be simple, relaxed, clean, and easy to understand.\n"
+    "- Avoid slang like 'Eh', 'Woi', 'Wooo', or excited interjections.\n"
+    "- Do NOT use 'Kesimpulan:', 'Translation:', 'Terjemahan:', or any kind of heading.\n"
+    "- Do NOT add emojis (unless present in original).\n"
+    "- Do NOT use shouty words or hype.\n"
+    "- Use natural keywords from the topic to improve SEO.\n"
+    "- Keep it concise, clear, and relevant.\n\n"
+)
+
+CONTENT_PROMPT = (
+    "Translate and convert the HTML tutorial article the user sends from English to Bahasa Malaysia in a blog post.\n\n"
+    "Your goal is to create a SEO-optimized, blog-style Bahasa Malaysia article suitable for Malaysian readers.\n\n"
+    + _CONTENT_RULES
+    + _CONCLUSION_RULES
+    + "Return only the rewritten article HTML.\n"
+)
+
+# Long articles are split on block boundaries and translated part by part.
+# Only the final part asks for the conclusion, so the article still gets exactly one.
+_CHUNK_INTRO = (
+    "Translate and convert the part of an HTML tutorial article the user sends from English to Bahasa Malaysia for a blog post.\n\n"
+    "Your goal is to create a SEO-optimized, blog-style Bahasa Malaysia article suitable for Malaysian readers.\n\n"
+)
+
+CHUNK_PROMPT = (
+    _CHUNK_INTRO
+    + _CONTENT_RULES
+    + "This is one part of a longer article. Translate only this part and return only its HTML. "
+    "Do NOT add an introduction, a conclusion or any commentary.\n"
+)
+
+FINAL_CHUNK_PROMPT = (
+    _CHUNK_INTRO
+    + _CONTENT_RULES
+    + "This is the last part of a longer article. Translate it and return only its HTML. Do NOT add an introduction.\n"
+    + _CONCLUSION_RULES
+)
+
+PROMPTS = {
+    "title": TITLE_PROMPT,
+    "content": CONTENT_PROMPT,
+    "chunk": CHUNK_PROMPT,
+    "final_chunk": FINAL_CHUNK_PROMPT,
+}
+
+TITLE_BATCH_SIZE = int(os.getenv("TITLE_BATCH_SIZE", "25"))  # Titles per request; 1 disables batching
+
+# Content longer than this is translated in parallel chunks of at most TRANSLATE_CHUNK_CHARS
+TRANSLATE_CHUNK_THRESHOLD = int(os.getenv("TRANSLATE_CHUNK_THRESHOLD", "6000"))
+TRANSLATE_CHUNK_CHARS = int(os.getenv("TRANSLATE_CHUNK_CHARS", "4000"))
+TRANSLATE_CHUNK_RETRIES = int(os.getenv("TRANSLATE_CHUNK_RETRIES", "1"))  # Extra rounds for failed chunks only
 
 class TranslatorAgent(BaseAgent):
-    def __init__(self, role, goal, backstory):
+    def __init__(self, role, goal, backstory, cache=None, client=None):
         super().__init__(role, goal, backstory)
+        # Set TRANSLATION_CACHE_FILE="" to disable the on-disk cache
+        if cache is None and TRANSLATION_CACHE_FILE:
+            cache = TranslationCache()
+            for kind, template in PROMPTS.items():
+                cache.invalidate_stale(kind, template)
+        self.cache = cache
+        self.client = client or GeminiClient(model=GEMINI_MODEL)
 
     def run(self, articles):
-        GOOGLE_API_KEY = os.getenv("GEMINI_API_KEY")
+        GOOGLE_API_KEY = self.client.api_key
 
         print("🔑 GEMINI_API_KEY status:", "✅ OK" if GOOGLE_API_KEY else "❌ MISSING")
         if not GOOGLE_API_KEY:
             print("❌ Translation skipped. No API key found.")
             return articles
 
-        gemini_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={GOOGLE_API_KEY}"
-        headers = {"Content-Type": "application/json"}
-        translated_articles = []
+        print(f"\n🔄 Translating {len(articles)} articles ({self.client.max_workers} requests in flight)...")
 
-        for article in articles:
-            print(f"\n🔄 Translating article: {article.get('title')[:60]}...")
-
-            # --- Translate Title ---
-            title_prompt = (
-                "Translate the following title into Malay (Bahasa Malaysia).\n"
-                "Only return the translated text without any explanation. Maintain crypto and trading topic related word in english in double quotes\n"
-                "Keep it simple, relaxed, and easy to understand.\n"
-                "Avoid using exaggerated slang words or interjections.\n"
-                "Do not translate brand names or product names.\n\n"
-                f"{article['title']}"
-            )
+        # Every title, body and body chunk is an independent request; run them all through the client's pool
+        jobs = []
+        title_slots = []
+        for start in range(0, len(articles), max(1, TITLE_BATCH_SIZE)):
+            batch = tuple(a['title'] for a in articles[start:start + max(1, TITLE_BATCH_SIZE)])
+            batch_job = self._add_job(jobs, "title_batch", batch)
+            title_slots.extend((batch_job, pos) for pos in range(len(batch)))
+        plans = [self._plan_content(jobs, article['content']) for article in articles]
+        results = self.client.map(self._run_job, jobs)
 
-            title_payload = {"contents": [{"parts": [{"text": title_prompt}]}]}
-            translated_title = ""
-
-            for attempt in range(3):
-                try:
-                    response = requests.post(gemini_url, headers=headers, json=title_payload)
-                    print("🌐 Gemini Title Response Status:", response.status_code)
-                    print("🌐 Gemini Title Response JSON:", response.text[:300])
-
-                    if response.status_code == 200:
-                        translated_title = (
-                            response.json()
-                            .get("candidates", [{}])[0]
-                            .get("content", {})
-                            .get("parts", [{}])[0]
-                            .get("text", "")
-                            .strip()
-                        )
-                        break
-                    time.sleep(2)
-                except Exception as e:
-                    print(f"❌ Title Translation Exception: {e}")
-            
-            if not translated_title:
-                translated_title = "[Translation failed]"
-            print("📝 Translated Title:", translated_title)
-
-            # --- Translate Content ---
-            content_prompt = (
-                "Translate and convert the following HTML tutorial article from English to Bahasa Malaysia in a blog post.\n\n"
-                "Your goal is to create a SEO-optimized, blog-style Bahasa Malaysia article suitable for Malaysian readers.\n\n"
-                "DO the following:\n"
-                "1. Translate all paragraph content into natural, fluent Bahasa Malaysia — make it sound like a real Malaysian crypto educator.\n"
-                "2. Use informal but professional tone (not textbook or robotic).\n"
-                "3. Retain the HTML structure, including <h1>, <h2>, <p>, <ul>, <ol>, <li>, <img>. Do NOT modify or translate anything inside <img> tags.\n"
-                "4. Keep all crypto and trading terms (e.g., futures, wallet, margin, liquidation) in English inside double quotes.\n"
-                "5. Then highlight those double-quoted terms by wrapping them with <strong>. Example: <strong>\"wallet\"</strong>.\n"
-                "6. Break long paragraphs into shorter ones for better readability.\n"
-                "7. Avoid repeating phrases — write concisely but clearly.\n"
-                "8. Translate into Bahasa Malaysia — NOT Bahasa Indonesia. Use 'anda', 'modal', 'untung', 'kerugian', 'dagangan', etc.\n\n"
-                "9. As for the SEO make sure follow the correct heading structure.\n"
-                "At the end of the article, write a short 1-paragraph conclusion (max 280 characters) in Bahasa Malaysia.\n"
-                "The conclusion should:\n"
-                "- Be written like a general observation or takeaway, NOT as a news source or formal summary.\n"
-                "- Use a natural, conversational, friendly Malaysian tone — like a friend sharing info.\n"
-                "- Be simple, relaxed, clean, and easy to understand.\n"
-                "- Avoid slang like 'Eh', 'Woi', 'Wooo', or excited interjections.\n"
-                "- Do NOT use 'Kesimpulan:', 'Translation:', 'Terjemahan:', or any kind of heading.\n"
-                "- Do NOT add emojis (unless present in original).\n"
-                "- Do NOT use shouty words or hype.\n"
-                "- Use natural keywords from the topic to improve SEO.\n"
-                "- Keep it concise, clear, and relevant.\n\n"
-                "Use the following article as a style and tone reference. Match its voice, structure, and clarity:\n\n"
-                "Now translate and rewrite the following article:\n\n"
-                f"{article['content']}"
-            )
+        # Retry only the chunks that failed, not the whole article
+        for _ in range(TRANSLATE_CHUNK_RETRIES):
+            failed = [i for i, job in enumerate(jobs) if job[0].endswith("chunk") and not results[i]]
+            if not failed:
+                break
+            print(f"🔁 Retrying {len(failed)} failed chunks...")
+            for i, retried in zip(failed, self.client.map(self._run_job, [jobs[i] for i in failed])):
+                results[i] = retried
 
-            content_payload = {"contents": [{"parts": [{"text": content_prompt}]}]}
-            translated_content = ""
-
-            for attempt in range(3):
-                try:
-                    response = requests.post(gemini_url, headers=headers, json=content_payload)
-                    print("🌐 Gemini Content Response Status:", response.status_code)
-                    print("🌐 Gemini Content Response JSON:", response.text[:300])
-
-                    if response.status_code == 200:
-                        translated_content = (
-                            response.json()
-                            .get("candidates", [{}])[0]
-                            .get("content", {})
-                            .get("parts", [{}])[0]
-                            .get("text", "")
-                            .strip()
-                        )
-                        break
-                    time.sleep(2)
-                except Exception as e:
-                    print(f"❌ Content Translation Exception: {e}")
-
-            if not translated_content:
-                translated_content = "[Translation failed]"
+        translated_articles = []
+        for article, (batch_job, pos), segments in zip(articles, title_slots, plans):
+            translated_title = results[batch_job][pos] or "[Translation failed]"
+            translated_content = self._assemble(segments, results) or "[Translation failed]"
 
+            print(f"\n📝 Translated Title: {article.get('title')[:60]} -> {translated_title}")
             print("📄 Translated Content Preview:\n", translated_content[:300])
 
             # --- Assign Results ---
@@ -122,4 +152,114 @@ class TranslatorAgent(BaseAgent):
             article["translated_html"] = translated_content
             translated_articles.append(article)
 
+        if self.cache is not None:
+            print(f"💾 Translation cache: {self.cache.stats()}")
+        print(f"🌐 Gemini client: {self.client.stats}")
+
         return translated_articles
+
+    def _add_job(self, jobs, kind, text):
+        jobs.append((kind, text))
+        return len(jobs) - 1
+
+    def _plan_content(self, jobs, content):
+        """Queue the jobs for one article body; returns its segments in document order.
+
+        Each segment is ``("image", html)`` to pass through, or ``("job", index)``.
+        """
+        if len(content) <= TRANSLATE_CHUNK_THRESHOLD:
+            return [("job", self._add_job(jobs, "content", content))]
+
+        chunks = chunk_html(content, TRANSLATE_CHUNK_CHARS)
+        last_text = max((i for i, (kind, _) in enumerate(chunks) if kind == "text"), default=None)
+        segments = []
+        for i, (kind, html) in enumerate(chunks):
+            if kind == "image":
+                segments.append(("image", html))
+            else:
+                job_kind = "final_chunk" if i == last_text else "chunk"
+                segments.append(("job", self._add_job(jobs, job_kind, html)))
+        print(f"✂️ Split long article ({len(content)} chars) into {len(segments)} segments.")
+        return segments
+
+    def _assemble(self, segments, results):
+        parts = []
+        for kind, value in segments:
+            if kind == "image":
+                parts.append(value)
+            elif not results[value]:
+                return ""  # A chunk failed even after retries; successful ones stay cached
+            else:
+                parts.append(results[value])
+        return "\n".join(parts)
+
+    def _run_job(self, job):
+        kind, text = job
+        if kind == "title_batch":
+            return self._translate_title_batch(list(text))
+        return self._translate(kind, PROMPTS[kind], text)
+
+    def _translate_title_batch(self, titles):
+        """Translate many titles in one request, falling back to one request per title."""
+        results = [None] * len(titles)
+        pending = []
+        for i, title in enumerate(titles):
+            cached = self.cache.get(cache_key(self.client.model, TITLE_PROMPT, title)) if self.cache is not None else None
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append(i)
+
+        if len(pending) > 1:
+            prompt = json.dumps([titles[i] for i in pending], ensure_ascii=False)
+            parsed = self._parse_title_batch(
+                self.client.generate(prompt, label="Gemini Title batch", system=TITLE_BATCH_PROMPT), len(pending)
+            )
+            if parsed is not None:
+                print(f"📦 Translated {len(pending)} titles in one request.")
+                for i, translated in zip(pending, parsed):
+                    results[i] = translated
+                    if self.cache is not None:
+                        self.cache.put(cache_key(self.client.model, TITLE_PROMPT, titles[i]), translated, "title", TITLE_PROMPT, self.client.model)
+                return results
+            print(f"⚠️ Malformed title batch response; translating {len(pending)} titles one by one.")
+
+        for i, translated in zip(pending, self.client.map(lambda i: self._translate("title", TITLE_PROMPT, titles[i]), pending)):
+            results[i] = translated
+        return results
+
+    def _parse_title_batch(self, text, expected):
+        """Return the list of translated titles, or None if the response isn't what we asked for."""
+        text = text.strip()
+        if text.startswith("```"):
+            text = text.strip("`")
+            text = text[text.find("["):]
+        try:
+            parsed = json.loads(text)
+        except ValueError:
+            return None
+        if not isinstance(parsed, list) or len(parsed) != expected:
+            return None
+        if not all(isinstance(t, str) and t.strip() for t in parsed):
+            return None
+        return [t.strip() for t in parsed]
+
+    def _translate(self, kind, template, text):
+        """Translate ``text`` with the prompt ``template``, going through the cache first."""
+        key = cache_key(self.client.model, template, text)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                print(f"💾 Cache hit for {kind}.")
+                return cached
+
+        # Images and long URLs travel as placeholders; the model never needs to read them
+        compacted, placeholders = compact_html(text)
+        translated = self.client.generate(compacted, label=f"Gemini {kind.capitalize()}", system=template)
+        if translated and placeholders:
+            translated, missing = restore_html(translated, placeholders)
+            if missing:
+                print(f"⚠️ {kind.capitalize()} translation dropped {len(missing)} placeholders; missing images were appended.")
+        if translated and self.cache is not None:
+            self.cache.put(key, translated, kind, template, self.client.model)
+        return translated
@@ -1,9 +1,43 @@
-from crewai import Agent
+from .base_agent import BaseAgent
+from .html_facts import FAILURE_MARKERS
+from .metrics import metrics
 
-class ValidatorAgent(Agent):
+class ValidatorAgent(BaseAgent):
     def run(self, articles):
         validated = []
         for a in articles:
-            if "final_html" in a and "<img" in a["final_html"]:
-                validated.append(a)
+            errors, warnings = self.check(a)
+            a["validation"] = {"passed": not errors, "errors": errors, "warnings": warnings}
+            for reason in errors:
+                metrics.inc("validation_failures_total", reason=reason.split(":")[0])
+            if errors:
+                print(f"🚫 Rejected {a.get('url', '?')}: {'; '.join(errors)}")
+                continue
+            if warnings:
+                print(f"⚠️ {a.get('url', '?')}: {'; '.join(warnings)}")
+            validated.append(a)
+        print(f"✅ Validation passed: {len(validated)}/{len(articles)} articles.")
         return validated
+
+    def check(self, article):
+        """(errors, warnings) from the facts RenderAgent computed; any error rejects the article."""
+        facts = (article.get("html_facts") or {}).get("translated_html")
+        if "final_html" not in article or facts is None:
+            return ["not rendered"], []
+
+        errors = []
+        if not facts["images"]:
+            errors.append("no images")
+        if facts["failure_markers"]:
+            errors.append(f"failure markers: {', '.join(facts['failure_markers'])}")
+        # The title isn't part of translated_html, so it has no facts of its own
+        title_markers = [marker for marker in FAILURE_MARKERS if marker in (article.get("translated_title") or "")]
+        if title_markers:
+            errors.append(f"title failure markers: {', '.join(title_markers)}")
+
+        warnings = []
+        if facts["broken_tags"]:
+            warnings.append(f"broken tags: {', '.join(facts['broken_tags'][:5])}")
+        if facts["heading_issues"]:
+            warnings.append(f"heading structure: {', '.join(facts['heading_issues'])}")
+        return errors, warnings
@@ -1,10 +1,17 @@
 import os
 import requests
 import base64
-import time
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from .base_agent import BaseAgent  # Ensure base_agent.py exists in the same package
-from .translator_agent import TranslatorAgent  # Import TranslatorAgent from translator_agent.py
+from .article_store import atomic_write
+from .log import get_logger
+from .media_cache import MediaCache, content_digest, sniff_image_type
+from .metrics import metrics
+from .rate_limit import retry_delay
 
 # === ENV VARIABLES (from GitHub Secrets or OS) ===
 WP_URL = os.getenv("WP_URL", "https://teknologiblockchain.com/wp-json/wp/v2")
@@ -12,72 +19,235 @@ WP_USER = os.getenv("WP_USER")
 WP_APP_PASSWORD = os.getenv("WP_APP_PASSWORD")
 PANDUAN_CATEGORY_ID = 1395  # Category ID for 'Panduan'
 
+WP_PUBLISH_WORKERS = int(os.getenv("WP_PUBLISH_WORKERS", "4"))  # Posts published at once
+WP_MAX_RETRIES = int(os.getenv("WP_MAX_RETRIES", "4"))
+# What to do with a post already published for a source URL: "changed" updates it only when the
+# article's content_hash differs from the one it was published with; "skip" or "update" always do that
+WP_EXISTING_POSTS = os.getenv("WP_EXISTING_POSTS", "changed")
+WP_POST_INDEX_FILE = os.getenv("WP_POST_INDEX_FILE", "wp_posts.json")  # Source URL -> post id and published content hash
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+log = get_logger(__name__)
+
 class WordPressAgent(BaseAgent):
-    def __init__(self, role, goal, backstory, translator_agent):
+    def __init__(self, role, goal, backstory, translator_agent=None, translate_missing=False, workers=WP_PUBLISH_WORKERS):
         super().__init__(role, goal, backstory)
-        self.translator_agent = translator_agent  # Accept translator_agent as a dependency
+        # Articles normally arrive already translated. With translate_missing=True,
+        # the ones without translated_html are sent through translator_agent first.
+        self.translator_agent = translator_agent
+        self.translate_missing = translate_missing
+        self.workers = max(1, workers)
+        self._auth_checked = False
+        self._session = None
+        self._post_index = None
+        self._media_cache = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        # One pooled session for every call; the Basic auth header is encoded once
+        if self._session is None:
+            credentials = f"{WP_USER}:{WP_APP_PASSWORD}"
+            token = base64.b64encode(credentials.encode()).decode()
+            session = requests.Session()
+            session.headers.update({"Authorization": f"Basic {token}"})
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.workers * 2)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._session = session
+        return self._session
+
+    @property
+    def post_index(self):
+        if self._post_index is None:
+            self._post_index = {}
+            if os.path.exists(WP_POST_INDEX_FILE):
+                try:
+                    with open(WP_POST_INDEX_FILE, "r", encoding="utf-8") as f:
+                        self._post_index = json.load(f)
+                except Exception as e:
+                    print(f"⚠️ Failed to load {WP_POST_INDEX_FILE}: {e}")
+        return self._post_index
+
+    @property
+    def media_cache(self):
+        if self._media_cache is None:
+            self._media_cache = MediaCache()
+        return self._media_cache
+
+    def _save_post_index(self):
+        with self._lock:
+            atomic_write(WP_POST_INDEX_FILE, lambda f: json.dump(self.post_index, f, indent=1))
+
+    def has_credentials(self):
+        return bool(WP_USER and WP_APP_PASSWORD)
 
     def run(self, articles):
         print("🚀 Posting to WordPress (drafts under Panduan category)...")
-        print(f"[DEBUG] WP_URL: {WP_URL}")
-        print(f"[DEBUG] WP_USER: {'✅ Loaded' if WP_USER else '❌ Not Set'}")
-        print(f"[DEBUG] WP_APP_PASSWORD: {'✅ Loaded' if WP_APP_PASSWORD else '❌ Not Set'}")
-
-        if not WP_USER or not WP_APP_PASSWORD:
+        if not self.has_credentials():
             print("❌ ERROR: WordPress credentials are missing. Make sure GitHub Secrets are passed correctly.")
-            return
+            return []
 
-        # 🔐 Quick credential check
-        self._test_wp_auth()
+        # 🔐 Quick credential check, once per agent (run is called per article when streaming)
+        if not self._auth_checked:
+            log.debug("wp.config", url=WP_URL, user_set=bool(WP_USER), password_set=bool(WP_APP_PASSWORD))
+            self._test_wp_auth()
+            self._auth_checked = True
 
-        posted_count = 0
-        for article in articles:
-            # First, translate the title and content
-            translated_articles = self.translator_agent.run([article])  # Use the passed translator agent
-            translated_article = translated_articles[0]  # Since we passed a list of 1 article
+        if self.translate_missing:
+            self._translate_missing(articles)
 
-            translated_title = translated_article.get("translated_title", translated_article.get("title"))
-            translated_content = translated_article.get("translated_html", translated_article.get("content"))
+        # Load the post index and media cache before the workers share them
+        self.post_index, self.media_cache
 
-            print(f"\n📄 Posting article: {translated_title}")
-            image_url = article.get("image", "")
-            original_url = article.get("url", "")
+        if len(articles) > 1 and self.workers > 1:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(articles))) as pool:
+                outcomes = list(pool.map(self._publish, articles))
+        else:
+            outcomes = [self._publish(article) for article in articles]
+        self._save_post_index()
+        if self._media_cache is not None:
+            self._media_cache.save()
 
-            media_id, uploaded_image_url = self.upload_image_to_wp(image_url)
+        print(f"\n📝 Total drafts posted: {outcomes.count('created')} created, "
+              f"{outcomes.count('updated')} updated, {outcomes.count('skipped')} skipped, "
+              f"{outcomes.count('failed')} failed")
+        # Failed posts aren't passed on, so they aren't saved (or marked seen) and get retried later
+        return [article for article, outcome in zip(articles, outcomes) if outcome != "failed"]
 
-            success = self.post_to_wp(translated_title, translated_content, original_url, uploaded_image_url, media_id)
+    def _publish(self, article):
+        """Create, update or skip the post for one article; returns what happened."""
+        start = time.perf_counter()
+        outcome = self._publish_article(article)
+        metrics.observe("article_seconds", time.perf_counter() - start, stage="publish")
+        metrics.inc("articles_total", stage="publish", outcome=outcome)
+        return outcome
 
-            if success:
-                posted_count += 1
-                print(f"✅ Draft saved: {translated_title}")
-            else:
-                print(f"❌ Failed to post: {translated_title}")
+    def _publish_article(self, article):
+        translated_title = article.get("translated_title", article.get("title"))
+        translated_content = article.get("translated_html", article.get("content"))
+        original_url = article.get("url", "")
+
+        existing_id = self.find_existing_post(original_url)
+        if existing_id and not self._should_update(article):
+            print(f"⏭️ Already posted (id {existing_id}), skipping: {translated_title}")
+            return "skipped"
+
+        print(f"\n📄 {'Updating' if existing_id else 'Posting'} article: {translated_title}")
+        image_url = article.get("image", "")
+
+        media_id, uploaded_image_url = self.upload_image_to_wp(image_url)
+
+        post_id = self.post_to_wp(translated_title, translated_content, original_url, uploaded_image_url, media_id, post_id=existing_id)
+
+        if not post_id:
+            print(f"❌ Failed to post: {translated_title}")
+            return "failed"
+
+        with self._lock:
+            self.post_index[original_url] = {"id": post_id, "content_hash": article.get("content_hash")}
+        print(f"✅ Draft saved: {translated_title}")
+        return "updated" if existing_id else "created"
+
+    def _request(self, method, path, **kwargs):
+        """Call the WordPress REST API, retrying throttling, 5xx and connection errors with backoff."""
+        kwargs.setdefault("timeout", 60)
+        response = None
+        endpoint = path.split("/")[1] if "/" in path else path
+        for attempt in range(WP_MAX_RETRIES + 1):
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, f"{WP_URL}{path}", **kwargs)
+                metrics.inc("api_requests_total", api="wordpress", endpoint=endpoint, status=response.status_code)
+                if response.status_code not in RETRYABLE_STATUSES:
+                    return response
+                print(f"⚠️ WordPress {method} {path} returned {response.status_code} (attempt {attempt + 1})")
+            except requests.RequestException as e:
+                metrics.inc("api_requests_total", api="wordpress", endpoint=endpoint, status="error")
+                if attempt == WP_MAX_RETRIES:
+                    raise
+                print(f"⚠️ WordPress {method} {path} failed (attempt {attempt + 1}): {e}")
+                response = None
+            finally:
+                metrics.observe("api_request_seconds", time.perf_counter() - start, api="wordpress", endpoint=endpoint)
+            if attempt < WP_MAX_RETRIES:
+                metrics.inc("api_retries_total", api="wordpress")
+                time.sleep(retry_delay(attempt, response))
+        return response
 
-            time.sleep(1)
+    def find_existing_post(self, original_url):
+        """Post id already published for this source URL, if any.
 
-        print(f"\n📝 Total drafts posted: {posted_count}")
-        return articles
+        Checks the local index first, then searches WordPress for a post whose
+        ``source_url`` meta (or the source link ``post_to_wp`` writes) carries the URL.
+        """
+        if not original_url:
+            return None
+        post_id, _ = self._indexed_post(original_url)
+        if post_id:
+            return post_id
+
+        try:
+            response = self._request("GET", "/posts", params={
+                "search": original_url, "status": "publish,future,draft,pending,private",
+                "context": "edit", "per_page": 10,
+            })
+        except Exception as e:
+            print(f"[Lookup Exception] {e}")
+            return None
+        if response is None or response.status_code != 200:
+            return None
+
+        # The exact link, not a substring: /learn/article/foo must not match /learn/article/foo-bar
+        source_links = (f"href='{original_url}'", f'href="{original_url}"')
+        for post in response.json():
+            meta = post.get("meta") or {}
+            content = (post.get("content") or {}).get("raw", "")
+            if (isinstance(meta, dict) and meta.get("source_url") == original_url) or any(link in content for link in source_links):
+                with self._lock:
+                    self.post_index[original_url] = {"id": post["id"], "content_hash": None}
+                return post["id"]
+        return None
+
+    def _indexed_post(self, original_url):
+        """(post id, content hash it was published with) from the local index; older entries are a bare id."""
+        with self._lock:
+            entry = self.post_index.get(original_url)
+        if isinstance(entry, dict):
+            return entry.get("id"), entry.get("content_hash")
+        return entry, None
+
+    def _should_update(self, article):
+        if WP_EXISTING_POSTS in ("skip", "update"):
+            return WP_EXISTING_POSTS == "update"
+        # "changed": an unknown published hash means it may be stale, and the scraper only
+        # sends articles on when they are new or changed, so the fresh translation wins
+        _, published_hash = self._indexed_post(article.get("url", ""))
+        return published_hash is None or published_hash != article.get("content_hash")
+
+    def _translate_missing(self, articles):
+        missing = [a for a in articles if not a.get("translated_html")]
+        if not missing:
+            return
+        if self.translator_agent is None:
+            print(f"⚠️ {len(missing)} articles are untranslated and no translator_agent was given; posting originals.")
+            return
+        print(f"🔄 Translating {len(missing)} untranslated articles before posting...")
+        self.translator_agent.run(missing)  # Updates the article dicts in place
 
     def _test_wp_auth(self):
-        credentials = f"{WP_USER}:{WP_APP_PASSWORD}"
-        token = base64.b64encode(credentials.encode()).decode()
-        headers = {"Authorization": f"Basic {token}"}
-        test_url = f"{WP_URL}/posts"
         try:
-            resp = requests.get(test_url, headers=headers)
-            print(f"[DEBUG] Auth Test Status: {resp.status_code}")
-            print(f"[DEBUG] Auth Test Response: {resp.text}")
+            resp = self._request("GET", "/posts", params={"per_page": 1, "_fields": "id"})
+            if resp.status_code == 200:
+                log.info("wp.auth_ok", status=resp.status_code)
+            else:
+                log.warning("wp.auth_failed", status=resp.status_code, body=resp.text[:300])
         except Exception as e:
             print(f"[Auth Test Exception] {e}")
 
-    def post_to_wp(self, title, content, original_url, uploaded_image_url=None, media_id=None):
-        credentials = f"{WP_USER}:{WP_APP_PASSWORD}"
-        token = base64.b64encode(credentials.encode()).decode()
-        headers = {
-            "Authorization": f"Basic {token}",
-            "Content-Type": "application/json"
-        }
-
+    def post_to_wp(self, title, content, original_url, uploaded_image_url=None, media_id=None, post_id=None):
+        """Create the post (or update ``post_id``); returns the post id, or None on failure."""
         image_html = f"<img src='{uploaded_image_url}' alt='{title}'/><br>" if uploaded_image_url else ""
         full_content = (
             f"<h1>{title}</h1><br>"
@@ -91,33 +261,45 @@ class WordPressAgent(BaseAgent):
             "title": title,
             "content": full_content,
             "status": "private",
-            "categories": [PANDUAN_CATEGORY_ID]
+            "categories": [PANDUAN_CATEGORY_ID],
+            "meta": {"source_url": original_url}  # Needs the key registered with show_in_rest; ignored otherwise
         }
 
         if media_id:
             post_data["featured_media"] = media_id
-            time.sleep(1)
-
-        print(f"[DEBUG] Posting to WordPress with payload:\n{json.dumps(post_data, indent=2)}")
-        print(f"[DEBUG] Headers:\n{headers}")
 
+        path = f"/posts/{post_id}" if post_id else "/posts"
+        log.debug("wp.post", path=path, title=title, content_chars=len(full_content), featured_media=media_id)
         try:
-            response = requests.post(f"{WP_URL}/posts", headers=headers, json=post_data)
-            print(f"[DEBUG] WP Response Status: {response.status_code}")
-            print(f"[DEBUG] WP Response Body: {response.text}")
-
-            return response.status_code == 201
+            response = self._request("POST", path, json=post_data)
+            if response.status_code in (200, 201):
+                new_id = response.json().get("id") or post_id
+                log.debug("wp.post_ok", status=response.status_code, post_id=new_id)
+                return new_id
+            log.warning("wp.post_failed", path=path, status=response.status_code, body=response.text[:300])
+            return None
         except Exception as e:
             print(f"[Post Exception] {e}")
-            return False
+            return None
 
-    def upload_image_to_wp(self, image_url):
+    def upload_image_to_wp(self, image_url, transform=None):
+        """Upload ``image_url`` to the media library; returns (media id, source_url).
+
+        ``transform`` may rewrite the downloaded bytes (e.g. recompress them)
+        before upload. Caching is keyed on the original bytes either way.
+        """
         if not image_url:
             print("[Upload Skipped] No image URL provided.")
             return None, None
 
+        # Seen this URL before: no download, no upload
+        cached = self.media_cache.lookup_url(image_url)
+        if cached:
+            print(f"[Media Cache] Reusing {cached[1]} for {image_url}")
+            return cached
+
         try:
-            img_response = requests.get(image_url, headers={"User-Agent": "Mozilla/5.0"})
+            img_response = self.session.get(image_url, headers={"User-Agent": "Mozilla/5.0", "Authorization": None}, timeout=60)
             if img_response.status_code != 200:
                 print(f"[Image Download Error] Status {img_response.status_code}")
                 return None, None
@@ -126,24 +308,35 @@ class WordPressAgent(BaseAgent):
             print(f"[Image Download Exception] {e}")
             return None, None
 
-        credentials = f"{WP_USER}:{WP_APP_PASSWORD}"
-        token = base64.b64encode(credentials.encode()).decode()
-        file_name = image_url.split("/")[-1] or "image.jpg"
+        # Same bytes under another URL: no upload
+        digest = content_digest(image_data)
+        cached = self.media_cache.lookup_digest(image_url, digest)
+        if cached:
+            print(f"[Media Cache] Identical image already uploaded as {cached[1]}")
+            return cached
+
+        if transform is not None:
+            image_data = transform(image_data)
+
+        content_type, ext = sniff_image_type(image_data, fallback=img_response.headers.get("Content-Type", "image/jpeg").split(";")[0])
+        file_name = image_url.split("?")[0].split("/")[-1] or "image"
+        if not file_name.lower().endswith(f".{ext}"):
+            file_name = f"{file_name.rsplit('.', 1)[0]}.{ext}"
 
         headers = {
-            "Authorization": f"Basic {token}",
             "Content-Disposition": f"attachment; filename={file_name}",
-            "Content-Type": "image/jpeg"
+            "Content-Type": content_type
         }
 
         try:
-            response = requests.post(f"{WP_URL}/media", headers=headers, data=image_data)
+            response = self._request("POST", "/media", headers=headers, data=image_data)
             if response.status_code == 201:
                 media = response.json()
-                print(f"[DEBUG] Image uploaded: {media.get('source_url')}")
+                log.debug("wp.media_uploaded", media_id=media.get("id"), source_url=media.get("source_url"), bytes=len(image_data))
+                self.media_cache.add(image_url, digest, media.get("id"), media.get("source_url"))
                 return media.get("id"), media.get("source_url")
             else:
-                print(f"[Upload Error] {response.status_code}: {response.text}")
+                print(f"[Upload Error] {response.status_code}: {response.text[:300]}")
         except Exception as e:
             print(f"[Upload Exception] {e}")
 
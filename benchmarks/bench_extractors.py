@@ -0,0 +1,69 @@
+"""Compare the article extractors on the saved fixture pages.
+
+    python benchmarks/bench_extractors.py [--repeat 50] [fixture.html ...]
+
+For every fixture and every installed backend this prints the time per page,
+the size of the extracted content, how many blocks it has, how many of those
+blocks are exact repeats, and a rough token count of what would be sent to
+Gemini.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.extractors import EXTRACTORS, lxml_html
+from agents.gemini_client import estimate_tokens
+from agents.html_chunker import split_blocks
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIXTURE_URL = "https://www.mexc.co/learn/article/fixture"
+
+
+def available_extractors():
+    for name, cls in EXTRACTORS.items():
+        if name == "lxml" and lxml_html is None:
+            print("⚠️ lxml isn't installed; skipping the lxml backend.")
+            continue
+        yield cls()
+
+
+def bench(extractor, html, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        article = extractor.extract(html, FIXTURE_URL)
+    elapsed = (time.perf_counter() - start) / repeat
+    blocks = split_blocks(article["content"]) if article else []
+    return {
+        "ms": elapsed * 1000,
+        "chars": len(article["content"]) if article else 0,
+        "blocks": len(blocks),
+        "duplicates": len(blocks) - len(set(blocks)),
+        "tokens": estimate_tokens(article["content"]) if article else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixtures", nargs="*", help="HTML files (default: benchmarks/fixtures/mexc_article_*.html)")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    fixtures = args.fixtures or sorted(glob.glob(os.path.join(FIXTURE_DIR, "mexc_article_*.html")))
+    extractors = list(available_extractors())
+
+    print(f"{'fixture':<32} {'backend':<6} {'ms/page':>8} {'chars':>7} {'blocks':>7} {'dupes':>6} {'~tokens':>8}")
+    for path in fixtures:
+        with open(path, "r", encoding="utf-8") as f:
+            html = f.read()
+        for extractor in extractors:
+            r = bench(extractor, html, args.repeat)
+            print(f"{os.path.basename(path):<32} {extractor.name:<6} {r['ms']:>8.2f} {r['chars']:>7} "
+                  f"{r['blocks']:>7} {r['duplicates']:>6} {r['tokens']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""Local stand-ins for mexc.co, the Gemini API and the WordPress REST API.
+
+One threaded HTTP server answers all three, so the whole pipeline can run
+offline:
+
+- ``GET /learn/trading-guide?page=N`` lists the N-th ``listing_page_size``
+  links out of ``articles`` (empty past the end), and
+  ``GET /learn/article/<slug>`` serves the saved fixture pages with the
+  title made unique per slug. Images under ``/api/file/`` are tiny PNGs.
+- ``POST /v1beta/models/<model>:generateContent`` returns a fake
+  "translation" of the prompt's input (a JSON array for title batches).
+- ``/wp-json/wp/v2/posts`` and ``/wp-json/wp/v2/media`` accept posts and
+  uploads like WordPress does.
+
+Gemini and WordPress can each be given a latency and a fraction of requests
+to reject with 429 + Retry-After. Every request is counted per endpoint.
+"""
+import glob
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# 1x1 transparent PNG
+TINY_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+
+class FakeServices:
+    def __init__(self, articles=10, gemini_latency=0.0, gemini_429_rate=0.0,
+                 wp_latency=0.0, wp_429_rate=0.0, retry_after=1, seed=0, listing_page_size=20):
+        self.articles = articles
+        self.listing_page_size = listing_page_size
+        self.gemini_latency = gemini_latency
+        self.gemini_429_rate = gemini_429_rate
+        self.wp_latency = wp_latency
+        self.wp_429_rate = wp_429_rate
+        self.retry_after = retry_after
+        self.counts = Counter()
+        self.prompt_chars = 0
+        self.posts = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._fixtures = []
+        for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "mexc_article_*.html"))):
+            with open(path, "r", encoding="utf-8") as f:
+                self._fixtures.append(f.read())
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                services._dispatch(self, "GET")
+
+            def do_POST(self):
+                services._dispatch(self, "POST")
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def reset_counts(self):
+        with self._lock:
+            self.counts.clear()
+            self.prompt_chars = 0
+
+    # --- plumbing ---
+
+    def _count(self, key):
+        with self._lock:
+            self.counts[key] += 1
+
+    def _throttled(self, rate):
+        with self._lock:
+            return self._random.random() < rate
+
+    def _send(self, handler, status, body=b"", content_type="application/json", headers=None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode("utf-8")
+        elif isinstance(body, str):
+            body = body.encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _body(self, handler):
+        length = int(handler.headers.get("Content-Length") or 0)
+        return handler.rfile.read(length) if length else b""
+
+    def _dispatch(self, handler, method):
+        url = urlparse(handler.path)
+        path = url.path
+        if path.startswith("/v1beta/models/"):
+            return self._gemini(handler)
+        if path.startswith("/wp-json/wp/v2/"):
+            return self._wordpress(handler, method, path[len("/wp-json/wp/v2"):], parse_qs(url.query))
+        if path.startswith("/learn/trading-guide"):
+            return self._listing(handler, int((parse_qs(url.query).get("page") or ["1"])[0]))
+        if path.startswith("/learn/article/"):
+            return self._article(handler, path.rsplit("/", 1)[-1])
+        if path.startswith("/api/file/"):
+            self._count("site image")
+            return self._send(handler, 200, TINY_PNG, "image/png")
+        self._count("not found")
+        self._send(handler, 404, {"error": "not found"})
+
+    # --- mexc.co ---
+
+    def _listing(self, handler, page):
+        self._count("site listing")
+        first = (page - 1) * self.listing_page_size + 1
+        last = min(page * self.listing_page_size, self.articles)
+        links = "".join(
+            f'<li><a href="/learn/article/tutorial-{i}"><span>Tutorial {i}</span></a></li>'
+            for i in range(first, last + 1)
+        )
+        more = f'<a href="/learn/trading-guide?page={page + 1}">Next</a>' if last < self.articles else ""
+        self._send(handler, 200, f"<html><body><h1>Trading Guide</h1><ul>{links}</ul>{more}</body></html>", "text/html")
+
+    def _article(self, handler, slug):
+        self._count("site article")
+        match = re.match(r"tutorial-(\d+)$", slug)
+        if not match or not self._fixtures:
+            return self._send(handler, 404, "<html></html>", "text/html")
+        n = int(match.group(1))
+        html = self._fixtures[n % len(self._fixtures)]
+        html = re.sub(r"(<h1[^>]*>)(.*?)(</h1>)", lambda m: f"{m.group(1)}{m.group(2)} (Part {n}){m.group(3)}", html, count=1)
+        html = html.replace("/api/file/download/learn/", f"/api/file/download/learn/{slug}-")
+        self._send(handler, 200, html, "text/html")
+
+    # --- Gemini ---
+
+    def _gemini(self, handler):
+        self._count("gemini generateContent")
+        payload = json.loads(self._body(handler) or b"{}")
+        if self.gemini_latency:
+            time.sleep(self.gemini_latency)
+        if self._throttled(self.gemini_429_rate):
+            self._count("gemini 429")
+            return self._send(handler, 429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED"}},
+                              headers={"Retry-After": str(self.retry_after)})
+
+        system = "\n".join(p.get("text", "") for p in (payload.get("systemInstruction") or {}).get("parts", []))
+        user = "\n".join(p.get("text", "") for c in payload.get("contents", []) for p in c.get("parts", []))
+        if not system:
+            # Instructions inline with the text: the text is what follows the last blank line
+            system, _, user = user.rpartition("\n\n")
+        prompt_chars = len(system) + len(user)
+        with self._lock:
+            self.prompt_chars += prompt_chars
+        output = self._fake_translation(system, user)
+        self._send(handler, 200, {
+            "candidates": [{"content": {"parts": [{"text": output}]}}],
+            "usageMetadata": {"promptTokenCount": prompt_chars // 4 + 1, "candidatesTokenCount": len(output) // 4 + 1,
+                              "totalTokenCount": (prompt_chars + len(output)) // 4 + 2},
+        })
+
+    def _fake_translation(self, system, text):
+        if "JSON array" in system:
+            try:
+                return json.dumps([f"[MS] {t}" for t in json.loads(text)], ensure_ascii=False)
+            except ValueError:
+                return "[]"
+        if "<" not in text:
+            return f"[MS] {text}"
+        return re.sub(r">([^<]+)<", lambda m: f">[MS] {m.group(1)}<", text)
+
+    # --- WordPress ---
+
+    def _wordpress(self, handler, method, path, query):
+        endpoint = "wp " + method + " " + re.sub(r"/\d+$", "/<id>", path)
+        self._count(endpoint)
+        body = self._body(handler)
+        if self.wp_latency:
+            time.sleep(self.wp_latency)
+        if self._throttled(self.wp_429_rate):
+            self._count("wp 429")
+            return self._send(handler, 429, {"code": "rest_too_many_requests"},
+                              headers={"Retry-After": str(self.retry_after)})
+
+        if path == "/posts" and method == "GET":
+            search = (query.get("search") or [""])[0]
+            with self._lock:
+                found = [p for p in self.posts.values() if search and search in p["content"]["raw"]]
+            return self._send(handler, 200, found)
+        if path == "/posts" and method == "POST":
+            data = json.loads(body or b"{}")
+            with self._lock:
+                post_id = len(self.posts) + 1
+                self.posts[post_id] = {"id": post_id, "meta": data.get("meta", {}),
+                                       "content": {"raw": data.get("content", "")}}
+            self._count("wp posts created")
+            return self._send(handler, 201, {"id": post_id})
+        if path.startswith("/posts/") and method == "POST":
+            return self._send(handler, 200, {"id": int(path.rsplit("/", 1)[-1])})
+        if path == "/media" and method == "POST":
+            with self._lock:
+                media_id = 1000 + self.counts["wp POST /media"]
+            return self._send(handler, 201, {"id": media_id, "source_url": f"{self.base_url}/wp-content/uploads/{media_id}.png"})
+        self._send(handler, 404, {"code": "rest_no_route"})
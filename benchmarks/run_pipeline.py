@@ -0,0 +1,194 @@
+"""Run main.main() end to end against the local fake services and report timings.
+
+    python benchmarks/run_pipeline.py --articles 20 --mode stream \\
+        --gemini-latency 0.3 --gemini-429-rate 0.05 --wp-latency 0.1 \\
+        --env GEMINI_MAX_WORKERS=8 --env WP_PUBLISH_WORKERS=4 --runs 2
+
+Each run works in a fresh temp directory (so caches and indexes start cold
+unless --runs > 1 reuses them) and reports per-stage time, overall wall time
+and throughput, and how many requests each fake endpoint received.
+Stage time is busy time summed over calls; in stream mode stages overlap, so
+it can add up to more than the wall time.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fake_services import FakeServices
+
+
+class StageTimer:
+    """Wraps agent methods to record calls, busy seconds and articles handled."""
+
+    def __init__(self):
+        self.stats = defaultdict(lambda: {"calls": 0, "seconds": 0.0, "articles": 0})
+        self._lock = threading.Lock()
+        self._patched = []
+
+    def wrap(self, cls, method, label):
+        original = getattr(cls, method)
+        timer = self
+
+        def timed(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(self, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                batch = args[0] if args and isinstance(args[0], list) else None
+                with timer._lock:
+                    entry = timer.stats[label]
+                    entry["calls"] += 1
+                    entry["seconds"] += elapsed
+                    entry["articles"] += len(batch) if batch is not None else 1
+
+        setattr(cls, method, timed)
+        self._patched.append((cls, method, original))
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+
+    def restore(self):
+        for cls, method, original in reversed(self._patched):
+            setattr(cls, method, original)
+
+
+def configure_env(services, args):
+    os.environ.update({
+        "SCRAPER_BASE_URL": services.base_url,
+        "SCRAPER_HOST_INTERVAL": "0",
+        "GEMINI_API_BASE": f"{services.base_url}/v1beta",
+        "GEMINI_API_KEY": "benchmark",
+        "GEMINI_RPM": str(args.gemini_rpm),
+        "WP_URL": f"{services.base_url}/wp-json/wp/v2",
+        "WP_USER": "benchmark",
+        "WP_APP_PASSWORD": "benchmark",
+        "PIPELINE_MODE": args.mode,
+        "METRICS_REPORT_FILE": "run_report.json",
+    })
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("SCRAPER_LISTING_PAGES", "auto")
+    os.environ.setdefault("DEDUP_ACTION", "off")  # The fake articles are copies of two fixtures
+    for item in args.env:
+        key, _, value = item.partition("=")
+        os.environ[key] = value
+
+
+def instrument(timer):
+    # Imported only after configure_env: the agents read their settings at import time
+    from agents.scraper_agent import ScraperAgent
+    from agents.image_validator import ImageValidator
+    from agents.dedup_agent import DedupAgent
+    from agents.translator_agent import TranslatorAgent
+    from agents.media_agent import MediaAgent
+    from agents.render_agent import RenderAgent
+    from agents.validator_agent import ValidatorAgent
+    from agents.wordpress_agent import WordPressAgent
+    from agents.saver_agent import SaverAgent
+
+    timer.wrap(ScraperAgent, "_discover_links", "scrape: listing")
+    timer.wrap(ScraperAgent, "_scrape_article", "scrape: article")
+    timer.wrap(ImageValidator, "run", "validate images")
+    timer.wrap(DedupAgent, "run", "dedupe")
+    timer.wrap(TranslatorAgent, "run", "translate")
+    timer.wrap(MediaAgent, "run", "rehost images")
+    timer.wrap(RenderAgent, "run", "render")
+    timer.wrap(ValidatorAgent, "run", "validate output")
+    timer.wrap(WordPressAgent, "run", "publish")
+    timer.wrap(SaverAgent, "run", "save")
+
+
+def report(run, wall, timer, services):
+    from agents.metrics import metrics
+
+    posts = services.counts["wp posts created"]
+    result = {
+        "run": run,
+        "wall_seconds": round(wall, 3),
+        "articles_published": posts,
+        "articles_per_second": round(posts / wall, 3) if wall else 0.0,
+        "stages": {name: dict(entry, seconds=round(entry["seconds"], 3)) for name, entry in timer.stats.items()},
+        "requests": dict(sorted(services.counts.items())),
+        "gemini_prompt_chars": services.prompt_chars,
+        "metrics": metrics.report(),
+    }
+
+    print(f"\n=== Run {run}: {wall:.2f}s wall, {posts} posts, {result['articles_per_second']} articles/s ===")
+    print(f"{'stage':<18} {'calls':>6} {'articles':>9} {'busy s':>8}")
+    for name, entry in result["stages"].items():
+        print(f"{name:<18} {entry['calls']:>6} {entry['articles']:>9} {entry['seconds']:>8.2f}")
+    print(f"\n{'endpoint':<32} {'requests':>8}")
+    for name, count in result["requests"].items():
+        print(f"{name:<32} {count:>8}")
+    print(f"{'gemini prompt chars':<32} {services.prompt_chars:>8}")
+    for cache, rate in result["metrics"]["cache_hit_rates"].items():
+        print(f"{'cache hit rate: ' + cache:<32} {rate:>8}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=10, help="Articles on the fake listing page")
+    parser.add_argument("--mode", choices=["batch", "stream"], default="batch")
+    parser.add_argument("--runs", type=int, default=1, help="Back-to-back runs sharing one work dir (warm caches)")
+    parser.add_argument("--gemini-latency", type=float, default=0.0, help="Seconds per Gemini call")
+    parser.add_argument("--gemini-429-rate", type=float, default=0.0, help="Fraction of Gemini calls rejected with 429")
+    parser.add_argument("--gemini-rpm", type=int, default=6000, help="GEMINI_RPM for the client")
+    parser.add_argument("--wp-latency", type=float, default=0.0, help="Seconds per WordPress call")
+    parser.add_argument("--wp-429-rate", type=float, default=0.0, help="Fraction of WordPress calls rejected with 429")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="Extra settings for the agents")
+    parser.add_argument("--json", metavar="PATH", help="Also write the reports to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own output")
+    args = parser.parse_args()
+
+    services = FakeServices(
+        articles=args.articles,
+        gemini_latency=args.gemini_latency,
+        gemini_429_rate=args.gemini_429_rate,
+        wp_latency=args.wp_latency,
+        wp_429_rate=args.wp_429_rate,
+    ).start()
+    json_path = os.path.abspath(args.json) if args.json else None
+    workdir = tempfile.mkdtemp(prefix="pipeline-bench-")
+    os.chdir(workdir)  # All state files are relative to the working directory
+    print(f"Fake services on {services.base_url}; working in {workdir}")
+
+    configure_env(services, args)
+    timer = StageTimer()
+    instrument(timer)
+    import main as pipeline_main
+
+    reports = []
+    try:
+        for run in range(1, args.runs + 1):
+            services.reset_counts()
+            timer.reset()
+            output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+            start = time.perf_counter()
+            with output:
+                pipeline_main.main([])
+            reports.append(report(run, time.perf_counter() - start, timer, services))
+    finally:
+        timer.restore()
+        services.stop()
+
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+        print(f"\nWrote {json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,100 +1,341 @@
+"""Scrape MEXC tutorials, translate them to Malay, publish them to WordPress and save the feed.
+
+    python main.py [all] [--stream] [--resume]   # the whole pipeline (default)
+    python main.py scrape      # scrape, validate images and drop near-duplicates, checkpoint the results
+    python main.py translate   # translate what `scrape` checkpointed
+    python main.py publish     # rehost images, render, validate and post the translated articles
+    python main.py save        # save published articles and export the feed
+    python main.py export      # rewrite the full translated_articles.json archive (slow; run occasionally)
+
+The single-stage commands hand articles to each other through the checkpoint
+store, and each one only imports the agents it runs.
+"""
+import argparse
 import sys
 import os
 
 # Add root directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from agents.scraper_agent import ScraperAgent
-from agents.image_validator import ImageValidator
-from agents.translator_agent import TranslatorAgent
-from agents.validator_agent import ValidatorAgent
-from agents.saver_agent import SaverAgent
-from agents.render_agent import RenderAgent
-from agents.wordpress_agent import WordPressAgent  # ✅ Make sure this is correct
-
-def main():
-    # Agent: Scraper
-    scraper = ScraperAgent(
-        role="Web Scraper",
-        goal="Scrape tutorials with all content and images intact.",
-        backstory="You are responsible for getting clean and complete tutorial content from the MEXC trading guide page."
-    )
+from agents.checkpoint_store import RETRY_STAGES, STAGES, CheckpointStore
+from agents.log import configure_logging
+from agents.metrics import metrics
 
-    # Agent: Image Validator
-    image_validator = ImageValidator(
-        role="Image Validator",
-        goal="Check that each article includes embedded images in the correct positions.",
-        backstory="You double-check every piece of content to ensure images are in place."
-    )
+# "batch" runs each stage over the whole list; "stream" pushes every article through all stages as soon as it is scraped
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "batch")
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "2"))  # Articles waiting between two stages
+PIPELINE_TRANSLATE_WORKERS = int(os.getenv("PIPELINE_TRANSLATE_WORKERS", "2"))
 
-    # Agent: Translator
-    translator = TranslatorAgent(
-        role="Translator",
-        goal="Translate text content to Malay without altering structure or images.",
-        backstory="You are a careful translator that preserves structure and converts only text."
-    )
+# Checkpoint stages each single-stage command runs ("scrape" also scrapes first)
+COMMAND_STAGES = {
+    "scrape": ("validate images", "dedupe"),
+    "translate": ("translate",),
+    "publish": ("rehost images", "render", "validate output", "publish"),
+    "save": ("save",),
+}
 
+STAGE_MESSAGES = {
+    "validate images": "Validating images...",
+    "dedupe": "Checking for near-duplicate articles...",
+    "translate": "Translating articles...",
+    "rehost images": "Rehosting inline images...",
+    "render": "Rendering articles into final HTML...",
+    "validate output": "Validating final output...",
+    "publish": "Posting to WordPress as drafts...",
+    "save": "Saving to JSON...",
+}
 
+class Agents:
+    """Creates each agent, and imports its module, the first time a stage asks for it."""
 
-    # Agent: Render Agent
-    renderer = RenderAgent(
-        role="Renderer",
-        goal="Render the translated tutorials into final structured HTML with images in correct positions.",
-        backstory="You take the translated and formatted content and create final HTML output for display."
-    )
+    def __init__(self, translate_missing=False):
+        # Only the full pipeline lets RenderAgent translate stragglers (and so import the translator)
+        self.translate_missing = translate_missing
+        self._agents = {}
 
-    # Agent: Output Validator
-    validator = ValidatorAgent(
-        role="Output Validator",
-        goal="Perform final validation to ensure quality and correctness.",
-        backstory="You are the final checkpoint for quality assurance."
-    )
+    def _get(self, name, build):
+        if name not in self._agents:
+            self._agents[name] = build()
+        return self._agents[name]
 
-    # Agent: Saver
-    saver = SaverAgent(
-        role="Saver",
-        goal="Save validated and rendered articles into a JSON file.",
-        backstory="You safely store the final tutorial collection for publishing."
-    )
+    @property
+    def scraper(self):
+        def build():
+            from agents.scraper_agent import ScraperAgent
+            return ScraperAgent(
+                role="Web Scraper",
+                goal="Scrape tutorials with all content and images intact.",
+                backstory="You are responsible for getting clean and complete tutorial content from the MEXC trading guide page."
+            )
+        return self._get("scraper", build)
 
-    #Agent: WordPress Publisher
-    wordpress = WordPressAgent(
-        role="WordPress Publisher",
-        goal="Post articles to WordPress as drafts under the Panduan category.",
-        backstory="You help publish tutorials to WordPress in an organized, safe manner.",
-        translator_agent=translator  # Pass the existing TranslatorAgent
-    )
+    @property
+    def image_validator(self):
+        def build():
+            from agents.image_validator import ImageValidator
+            return ImageValidator(
+                role="Image Validator",
+                goal="Check that each article includes embedded images in the correct positions.",
+                backstory="You double-check every piece of content to ensure images are in place."
+            )
+        return self._get("image_validator", build)
+
+    @property
+    def dedup(self):
+        def build():
+            from agents.dedup_agent import DedupAgent
+            return DedupAgent(
+                role="Duplicate Checker",
+                goal="Stop near-identical tutorials from being translated and published twice.",
+                backstory="You remember every tutorial we've published and spot reworded copies."
+            )
+        return self._get("dedup", build)
 
+    @property
+    def translator(self):
+        def build():
+            from agents.translator_agent import TranslatorAgent
+            return TranslatorAgent(
+                role="Translator",
+                goal="Translate text content to Malay without altering structure or images.",
+                backstory="You are a careful translator that preserves structure and converts only text."
+            )
+        return self._get("translator", build)
+
+    @property
+    def renderer(self):
+        def build():
+            from agents.render_agent import RenderAgent
+            return RenderAgent(
+                role="Renderer",
+                goal="Render the translated tutorials into final structured HTML with images in correct positions.",
+                backstory="You take the translated and formatted content and create final HTML output for display.",
+                translator_agent=self.translator if self.translate_missing else None  # Only for articles that reach it untranslated
+            )
+        return self._get("renderer", build)
+
+    @property
+    def validator(self):
+        def build():
+            from agents.validator_agent import ValidatorAgent
+            return ValidatorAgent(
+                role="Output Validator",
+                goal="Perform final validation to ensure quality and correctness.",
+                backstory="You are the final checkpoint for quality assurance."
+            )
+        return self._get("validator", build)
+
+    @property
+    def saver(self):
+        def build():
+            from agents.saver_agent import SaverAgent
+            return SaverAgent(
+                role="Saver",
+                goal="Save validated and rendered articles into a JSON file.",
+                backstory="You safely store the final tutorial collection for publishing."
+            )
+        return self._get("saver", build)
+
+    @property
+    def wordpress(self):
+        def build():
+            from agents.wordpress_agent import WordPressAgent
+            return WordPressAgent(
+                role="WordPress Publisher",
+                goal="Post articles to WordPress as drafts under the Panduan category.",
+                backstory="You help publish tutorials to WordPress in an organized, safe manner."
+            )
+        return self._get("wordpress", build)
+
+    @property
+    def media(self):
+        def build():
+            from agents.media_agent import MediaAgent
+            return MediaAgent(
+                role="Media Rehoster",
+                goal="Move every inline tutorial image onto our WordPress media library.",
+                backstory="You make sure published tutorials don't depend on the source site's CDN.",
+                wordpress_agent=self.wordpress
+            )
+        return self._get("media", build)
+
+    def stage_fn(self, stage):
+        """fn(articles) -> articles for one batch stage."""
+        if stage == "save":
+            def save(articles):
+                self.saver.run(articles)
+                return articles
+            return save
+        agent = {
+            "validate images": "image_validator",
+            "dedupe": "dedup",
+            "translate": "translator",
+            "rehost images": "media",
+            "render": "renderer",
+            "validate output": "validator",
+            "publish": "wordpress",
+        }[stage]
+        return getattr(self, agent).run
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", nargs="?", default="all", choices=["all", *COMMAND_STAGES, "export"])
+    parser.add_argument("--stream", action="store_true", help="Stream articles through every stage (all only; also PIPELINE_MODE=stream)")
+    parser.add_argument("--resume", action="store_true", help="Finish the articles an interrupted run checkpointed (all only)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging()
+    metrics.reset()
     try:
-        print("Scraping articles...")
-        articles = scraper.run()
+        if args.command == "all":
+            run_pipeline(stream=args.stream or PIPELINE_MODE == "stream", resume_only=args.resume)
+        elif args.command == "export":
+            with metrics.timer("stage_seconds", stage="export"):
+                Agents().saver.export(archive=True)
+        else:
+            run_command(args.command)
+    finally:
+        metrics.write_report()
 
-        print("Validating images...")
-        validated_articles = image_validator.run(articles)
+def run_command(command):
+    """Run one group of stages on the articles the previous command checkpointed."""
+    agents = Agents()
+    stages = batch_stages(agents, COMMAND_STAGES[command])
+    checkpoints = CheckpointStore()
+    try:
+        if command == "scrape":
+            print("Scraping articles...")
+            with metrics.timer("stage_seconds", stage="scrape"):
+                articles = agents.scraper.run(on_article=lambda a: checkpoints.record("scrape", [a]))
+            done = run_stages(stages, articles, checkpoints)
+        else:
+            done = run_stages(stages, [], checkpoints, resumed=checkpoints.pending())
+        print(f"✅ {command}: {len(done)} articles done; checkpoints now {checkpoints.summary()}")
+    except Exception as e:
+        print(f"❌ ERROR in {command}: {e}")
+        print(f"💾 Progress so far is checkpointed in {checkpoints.path}.")
+    finally:
+        checkpoints.close()
 
-        print("Translating articles...")
-        translated_articles = translator.run(validated_articles)
+def run_pipeline(stream=False, resume_only=False):
+    agents = Agents(translate_missing=True)
+    stages = batch_stages(agents, STAGES[1:])
+    checkpoints = CheckpointStore()
+    try:
+        if resume_only:
+            resume(stages, checkpoints)
+            return
 
-        print("Rendering articles into final HTML...")
-        rendered_articles = renderer.run(translated_articles)
+        if len(checkpoints):
+            print(f"⚠️ {len(checkpoints)} articles from an interrupted run are checkpointed "
+                  f"{checkpoints.summary()}; run with --resume to finish them.")
 
-        print("Validating final output...")
-        final_validated = validator.run(rendered_articles)
+        if stream:
+            run_streaming(agents, checkpoints)
+            return
 
-        print("Posting to WordPress as drafts...")
-        wordpress.run(final_validated)  # ✅ Moved here after validation
+        print("Scraping articles...")
+        with metrics.timer("stage_seconds", stage="scrape"):
+            articles = agents.scraper.run(on_article=lambda a: checkpoints.record("scrape", [a]))
 
-        print("Saving to JSON...")
-        saver.run(final_validated)
+        final_validated = run_stages(stages, articles, checkpoints)
         print("✅ Translated Articles:")
-        for a in translated_articles:
+        for a in final_validated:
             print("Title:", a.get("translated_title"))
-            print("Content preview:", a.get("translated_html")[:200])
-            
+            print("Content preview:", (a.get("translated_html") or "")[:200])
+
         print("✅ Process completed successfully!")
 
     except Exception as e:
         print(f"❌ ERROR in pipeline: {e}")
+        if len(checkpoints):
+            print(f"💾 Progress so far is checkpointed in {checkpoints.path}; run with --resume to continue from there.")
+    finally:
+        checkpoints.close()
+
+def batch_stages(agents, names):
+    """(stage, progress message, fn(articles) -> articles) for each named stage.
+
+    The functions are resolved lazily, so building the list imports nothing.
+    """
+    def lazy(stage):
+        return lambda articles: agents.stage_fn(stage)(articles)
+    return [(stage, STAGE_MESSAGES[stage], lazy(stage)) for stage in names]
+
+def run_stages(stages, articles, checkpoints, resumed=None):
+    """Run ``articles`` through ``stages`` in batch, checkpointing after each stage.
+
+    ``resumed`` maps a stage name to checkpointed articles that already
+    completed it; they join the batch at the next stage. Articles a stage
+    drops are forgotten, except that ``RETRY_STAGES`` failures stay
+    checkpointed so they are retried.
+    """
+    resumed = resumed or {}
+    articles = list(articles)
+    for stage, message, fn in stages:
+        articles = articles + resumed.get(STAGES[STAGES.index(stage) - 1], [])
+        if articles:
+            print(message)
+            with metrics.timer("stage_seconds", stage=stage):
+                done = fn(articles) or []
+            kept = {a.get("url") for a in done}
+            if stage not in RETRY_STAGES:
+                checkpoints.forget([a for a in articles if a.get("url") not in kept])  # Rejected by this stage
+            if stage == STAGES[-1]:
+                checkpoints.forget(done)
+            else:
+                checkpoints.record(stage, done)
+            articles = done
+    return articles
+
+def resume(stages, checkpoints):
+    pending = checkpoints.pending()
+    if not pending:
+        print("✅ Nothing to resume: no checkpointed articles.")
+        return
+    print(f"♻️ Resuming {len(checkpoints)} checkpointed articles {checkpoints.summary()}...")
+    try:
+        finished = run_stages(stages, [], checkpoints, resumed=pending)
+        print(f"✅ Resumed run completed: {len(finished)} articles saved.")
+    except Exception as e:
+        print(f"❌ ERROR in resumed pipeline: {e}")
+        print(f"💾 Remaining progress is still checkpointed in {checkpoints.path}.")
+
+def run_streaming(agents, checkpoints):
+    from agents.pipeline import StreamingPipeline, agent_stage, checkpointed, side_effect_stage
+
+    stages = [
+        agent_stage("validate images", agents.image_validator),
+        agent_stage("dedupe", agents.dedup),
+        agent_stage("translate", agents.translator, workers=PIPELINE_TRANSLATE_WORKERS),
+        agent_stage("rehost images", agents.media),
+        agent_stage("render", agents.renderer),
+        agent_stage("validate output", agents.validator),
+        agent_stage("publish", agents.wordpress),
+        side_effect_stage("save", lambda a: agents.saver.run([a], export=False)),
+    ]
+    pipeline = StreamingPipeline(
+        [checkpointed(stage, checkpoints, last=stage is stages[-1]) for stage in stages],
+        queue_size=PIPELINE_QUEUE_SIZE,
+    )
+
+    def scraped():
+        for article in agents.scraper.iter_articles():
+            checkpoints.record("scrape", [article])
+            yield article
+
+    print("Streaming articles through the pipeline...")
+    try:
+        completed = pipeline.run(scraped())
+    finally:
+        # Also after a failure: it indexes everything that was saved, so the next run skips it
+        with metrics.timer("stage_seconds", stage="export"):
+            agents.saver.export()
+    for name, counts in pipeline.stats.items():
+        print(f"📊 {name}: {counts}")
+    print(f"✅ Process completed: {completed} articles published and saved.")
 
 if __name__ == "__main__":
     main()